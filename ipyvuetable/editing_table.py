@@ -1,4 +1,8 @@
+import contextlib
 import datetime
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any, Literal
 
 import ipyvuetify as v
@@ -14,6 +18,8 @@ DialogWidget = VuetifyWidget | FileInput | VirtualAutocomplete
 
 
 class EditingTable(Table):
+    journal_max_bytes = 64 * 2**20  # memory budget of the undo/redo history
+
     new_items: list[dict[str, Any]] = t.List(t.Dict({}), default_value=[{}], allow_none=True).tag(sync=True)  # type: ignore
 
     def __init__(
@@ -22,9 +28,16 @@ class EditingTable(Table):
         hide_dialog_keys: list[str] = [],
         default_dialog_values: dict[str, Any] = {},
         *args: Any,
+        sink: utils.ChangeSetSink | None = None,
         **kwargs: Any,
     ):
+        self.journal = utils.EditJournal(self.journal_max_bytes)
+        self.sink = sink  # receives the edits in batches
         super().__init__(df, *args, **kwargs)
+        if self.sink is not None:
+            if self.item_key == self.row_nr:
+                raise ValueError("a sink needs an item_key")
+            self.sink.attach(self.item_key, self.schema, self._get_rows_by_key)
 
         self.save_btn = v.Btn(children=["Save"], color="blue darken-1")
 
@@ -34,6 +47,7 @@ class EditingTable(Table):
         self.dialog_widgets: dict[str, DialogWidget] = {}
         self.dialog_values: dict[str, Any] = {}
         self.hide_dialog_keys = hide_dialog_keys
+        self._change_set: utils.ChangeSet | None = None  # buffered edits of the open transaction
         self.dialog_widgets_container = v.Col()
         self.dialog.children = [
             v.Card(
@@ -47,18 +61,221 @@ class EditingTable(Table):
 
         self.save_btn.on_event("click", self._on_save_dialog)
 
+    def begin(self) -> None:
+        """
+        open a transaction: the following create, update and delete calls are buffered
+        and applied at once by commit, or dropped by rollback
+        """
+        if self.item_key == self.row_nr:
+            raise ValueError("transactions need an item_key")
+        if self._change_set is not None:
+            raise RuntimeError("a transaction is already open")
+        self._change_set = utils.ChangeSet(self.item_key, self.schema)
+
+    def commit(self) -> None:
+        change_set, self._change_set = self._change_set, None
+        if change_set is not None and not change_set.is_empty():
+            change_set.apply(self)
+
+    def rollback(self) -> None:
+        self._change_set = None
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator["EditingTable"]:
+        """
+        with table.transaction():
+            table.update(...)
+            table.delete(...)
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def create(self, rows: pl.DataFrame | list[dict[str, Any]]) -> None:
+        rows = pl.DataFrame(rows)
+        if self._change_set is None:
+            # the rows are conformed to the schema as in a transaction
+            self.apply_delta(inserted=utils.conform_rows(rows, self.schema))
+        else:
+            self._change_set.create(rows)
+
+    def update(self, rows: pl.DataFrame | list[dict[str, Any]]) -> None:
+        """modify the given columns of the rows with the same item_key"""
+        rows = pl.DataFrame(rows)
+        if self._change_set is None:
+            self.apply_delta(updated=utils.conform_update(rows, self.item_key, self.schema))
+        else:
+            self._change_set.update(rows)
+
+    def delete(self, keys: list[Any] | pl.Series) -> None:
+        if self._change_set is None:
+            self.apply_delta(deleted_keys=keys)
+        else:
+            self._change_set.delete(pl.Series(self.item_key, keys))
+
+    def apply_delta(
+        self,
+        inserted: pl.DataFrame | pl.LazyFrame | None = None,
+        updated: pl.DataFrame | pl.LazyFrame | None = None,
+        deleted_keys: list[Any] | pl.Series | None = None,
+        on: str | None = None,
+        positions: list[int] | pl.Series | None = None,
+    ) -> None:
+        """Table.apply_delta, the edit is recorded in the undo history"""
+        version = self.df_version
+        inverse = self._apply_delta(
+            utils.to_eager(inserted), utils.to_eager(updated), deleted_keys, on, positions
+        )
+        self.journal.record(inverse, version, self.df_version)
+        self._update_action_status()
+
+    def undo(self) -> None:
+        self._replay(self.journal.undo_stack, self.journal.redo_stack)
+
+    def redo(self) -> None:
+        self._replay(self.journal.redo_stack, self.journal.undo_stack)
+
+    def _replay(self, stack: list, opposite_stack: list) -> None:
+        delta = self.journal.pop(stack, self.df_version)
+        if delta is not None:
+            inverse = self._apply_delta(**delta)
+            self.journal.push(opposite_stack, inverse, self.df_version)
+        self._update_action_status()
+
+    def _apply_delta(
+        self,
+        inserted: pl.DataFrame | None = None,
+        updated: pl.DataFrame | None = None,
+        deleted_keys: list[Any] | pl.Series | None = None,
+        on: str | None = None,
+        positions: list[int] | pl.Series | None = None,
+    ) -> dict[str, Any] | None:
+        """apply a delta and pass it to the sink, returns the delta reverting it"""
+        on = self.item_key if on is None else on
+        deleted_keys = pl.Series(self.item_key, deleted_keys) if deleted_keys is not None else None
+        positions = pl.Series(self.row_nr, positions, dtype=pl.UInt32) if positions is not None else None
+        inverse = self._get_inverse_delta(inserted, updated, deleted_keys, on, positions)
+        if self.sink is not None:
+            self._log_delta(inserted, updated, deleted_keys, on)
+        super().apply_delta(inserted, updated, deleted_keys, on, positions)
+        if self.sink is not None and self.sink.change_set.schema != self.schema:
+            self.sink.attach(self.item_key, self.schema, self._get_rows_by_key)
+        return inverse
+
+    def _log_delta(
+        self,
+        inserted: pl.DataFrame | None,
+        updated: pl.DataFrame | None,
+        deleted_keys: pl.Series | None,
+        on: str,
+    ) -> None:
+        """pass a delta to the sink keyed by item_key, before it is applied"""
+        if deleted_keys is not None and len(deleted_keys):
+            self.sink.delete(deleted_keys)
+        if updated is not None and updated.height:
+            if on != self.item_key:
+                rows = self._get_rows_on(on, updated.get_column(on), deleted_keys)
+                if self.item_key in updated.columns:
+                    # the keys are modified: for the sink, the rows are replaced
+                    self.sink.delete(rows.get_column(self.item_key))
+                    self.sink.create(rows.update(updated, on=on, include_nulls=True))
+                    updated = None
+                else:
+                    updated = updated.join(rows.select(on, self.item_key), on=on)
+            if updated is not None:
+                self.sink.update(updated)
+        if inserted is not None and inserted.height:
+            self.sink.create(inserted)
+
+    def _get_rows_on(self, on: str, keys: pl.Series, deleted_keys: pl.Series | None = None) -> pl.DataFrame:
+        """current rows matched by the `on` values of a delta, row numbers are the ones of the delta"""
+        if self.is_lazy:
+            return self.df.filter(pl.col(on).is_in(keys)).collect()
+        if on == self.row_nr:
+            # rows are updated once the deleted ones are removed, the row numbers don't count them
+            if deleted_keys is None or not len(deleted_keys):
+                return self._eager_df.select(pl.all().gather(keys))
+            df = self._eager_df.filter(~pl.col(self.item_key).is_in(deleted_keys))
+            return df.select(pl.all().gather(keys)).with_columns(keys.cast(pl.UInt32).alias(self.row_nr))
+        if on == self.item_key:
+            return self._eager_df.select(pl.all().gather(self._lookup_row_nrs(keys)))
+        return self._eager_df.filter(pl.col(on).is_in(keys))
+
+    def _get_inverse_delta(
+        self,
+        inserted: pl.DataFrame | None = None,
+        updated: pl.DataFrame | None = None,
+        deleted_keys: pl.Series | None = None,
+        on: str | None = None,
+        positions: pl.Series | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        apply_delta arguments reverting the given delta, computed before it is applied.
+        Only the modified rows and columns are kept, None if the delta can't be reverted.
+        The deleted rows are inserted back at their row numbers, so that undo restores the order of df.
+        """
+        is_keyed = self.item_key != self.row_nr
+        delta_columns = {c for delta in [inserted, updated] if delta is not None for c in delta.columns}
+        if not delta_columns <= {*self.schema, self.row_nr, on}:
+            return None  # a new column is not removed by a delta
+        has_deleted = deleted_keys is not None and len(deleted_keys) > 0
+        if not is_keyed and has_deleted:
+            # the row numbers to delete must all exist to be inserted back
+            is_valid = (
+                deleted_keys.n_unique() == len(deleted_keys)
+                and deleted_keys.min() >= 0
+                and deleted_keys.max() < self.df_height
+            )
+            if not is_valid:
+                return None
+
+        inverse: dict[str, Any] = {}
+        if inserted is not None and inserted.height:
+            if is_keyed:
+                if self.item_key not in inserted.columns:
+                    return None
+                inverse["deleted_keys"] = inserted.get_column(self.item_key)
+            elif positions is not None:
+                inverse["deleted_keys"] = positions
+            else:
+                # inserted rows are appended after the deletion
+                height = self.df_height - len(deleted_keys) if has_deleted else self.df_height
+                inverse["deleted_keys"] = pl.int_range(height, height + inserted.height, eager=True)
+
+        if updated is not None and updated.height:
+            columns = [c for c in updated.columns if c in self.schema and c != on]
+            # the rows are matched back on their keys, or on their row numbers when the keys are modified
+            inverse_on = self.item_key if is_keyed and self.item_key not in columns else self.row_nr
+            rows = self._get_rows_on(on, updated.get_column(on), deleted_keys)
+            inverse["updated"] = rows.select(inverse_on, *[c for c in columns if c != inverse_on])
+            inverse["on"] = inverse_on
+
+        if has_deleted:
+            rows = self._get_rows_on(self.item_key, deleted_keys)
+            inverse["inserted"] = rows.drop(self.row_nr)
+            inverse["positions"] = rows.get_column(self.row_nr)
+        return inverse
+
     def _on_input_table(self, widget, event, data):
-        super()._on_input_table()
+        super()._on_input_table(widget, event, data)
 
     def _on_click_edit_item_btn(self, widget, event, data):
-        self.dialog_values = {}
-        selected = self.df_selected.collect()
-        for col, values in selected.to_dict(as_series=False).items():
-            if col == self.row_nr:
-                self.dialog_values[col] = values
-            elif len(values) == 1 or (len(set(str(v) for v in values)) == 1 and values[0] is not None):
-                self.dialog_values[col] = values[0]
-        self._show_dialog("MultiEdit" if len(selected) > 1 else "Edit")
+        # in select-all mode, the rows are never collected: they are edited through df_selected ("*")
+        row_nrs = "*" if self.is_select_all else self.selection.to_list()
+        self.dialog_values = {self.row_nr: row_nrs}
+        # the values shared by all the selected rows are counted by polars, the selection can be large
+        first_row, n_unique = pl.collect_all(
+            [self.df_selected.head(1), self.df_selected.select(pl.exclude(self.row_nr).n_unique())]
+        )
+        first_row = first_row.row(0, named=True)
+        for col, count in n_unique.row(0, named=True).items():
+            if self.nb_selected == 1 or (count == 1 and first_row[col] is not None):
+                self.dialog_values[col] = first_row[col]
+        self._show_dialog("MultiEdit" if self.nb_selected > 1 else "Edit")
 
     def _on_click_new_item_btn(self, widget, event, data):
         self.dialog_values = self.default_dialog_values
@@ -70,19 +287,20 @@ class EditingTable(Table):
         self._show_dialog("Create")
 
     def _on_click_delete_btn(self, *args):
-        self.df = self.df.join(self.df_selected, how="anti", on=self.row_nr)
-        self.v_model = []
+        self.delete(self.df_selected.select(self.item_key).collect().to_series())
+        self.clear_selection()
 
     def _on_save_dialog(self, widget, event, data):
         self.dialog.v_model = False
 
-        indexes: list[int] | None = self.dialog_values.get(self.row_nr)
+        indexes: list[int] | Literal["*"] | None = self.dialog_values.get(self.row_nr)
+        nb_rows = self.nb_selected if indexes == "*" else len(indexes or [])
         new_item: dict[str, Any] = {
             c: widget.v_model
             for c, widget in self.dialog_widgets.items()
             if indexes is None  # In case of click_new
-            or len(indexes) == 1  # In case of click_edit one element
-            or (len(indexes) > 1 and widget.v_model is not None)  # In case of click_edit multiple elements
+            or nb_rows == 1  # In case of click_edit one element
+            or (nb_rows > 1 and widget.v_model is not None)  # In case of click_edit multiple elements
         }
         for c, value in new_item.items():
             dtype = self.schema[c]
@@ -131,6 +349,16 @@ class EditingTable(Table):
         else:
             default_new_item = {}
 
+        if indexes == "*":
+            # select-all: the values are set on the rows of df_selected without collecting or syncing them
+            self.df_updated_rows = self.df_selected.select(
+                self.row_nr, *[pl.lit(value, dtype=self.schema[c]).alias(c) for c, value in new_item.items()]
+            )
+            self.previous_items = None
+            self.new_items = None
+            self.apply_delta(updated=self.df_updated_rows, on=self.row_nr)
+            return
+
         self.df_updated_rows = (
             pl.LazyFrame([new_item | default_new_item])
             # .with_columns(**default_new_item)
@@ -148,26 +376,21 @@ class EditingTable(Table):
         self.new_items = self.df_updated_rows.pipe(self.jsonify).collect().to_dicts()
 
         if indexes is not None:
-            self.df = self.df.update(self.df_updated_rows, on=self.row_nr, include_nulls=True)
+            self.apply_delta(updated=self.df_updated_rows.select(self.row_nr, *new_item), on=self.row_nr)
         else:
-            self.df = pl.concat([self.df, self.df_updated_rows.select(self.row_nr, *self.schema)])
+            self.create(self.df_updated_rows.select(*self.schema).collect())
 
     def _get_dialog_widgets(self) -> dict[str, DialogWidget]:
         dialog_widgets = {}
         for col, dtype in self.schema.items():
-            column_repr = self.columns_repr.get(col)
+            column_repr = self.columns_repr_mapping.get(col)
             if column_repr is not None:
                 single_select = not isinstance(dtype, pl.List)
-                column_repr = (
-                    column_repr.select(
-                        [
-                            pl.col(col).name.suffix("__key"),
-                            pl.col(f"{col}__repr").alias(col),
-                        ]
-                    )
-                    # https://github.com/pola-rs/polars/issues/10982
-                    .collect()
-                    .lazy()
+                column_repr = column_repr.lazy().select(
+                    [
+                        pl.col(col).name.suffix("__key"),
+                        pl.col(f"{col}__repr").alias(col),
+                    ]
                 )
                 widget = VirtualAutocomplete(
                     col,
@@ -273,10 +496,22 @@ class EditingTable(Table):
             "tooltip": "Add new item",
         }
 
+        actions["undo"] = {
+            "obj": v.Icon(children=["mdi-undo"], color="primary", disabled=True),
+            "tooltip": "Undo",
+        }
+
+        actions["redo"] = {
+            "obj": v.Icon(children=["mdi-redo"], color="primary", disabled=True),
+            "tooltip": "Redo",
+        }
+
         actions["edit"]["obj"].on_event("click", self._on_click_edit_item_btn)
         actions["new"]["obj"].on_event("click", self._on_click_new_item_btn)
         actions["duplicate"]["obj"].on_event("click", self._on_click_duplicate_item_btn)
         actions["delete"]["obj"].on_event("click", self._on_click_delete_btn)
+        actions["undo"]["obj"].on_event("click", lambda *args: self.undo())
+        actions["redo"]["obj"].on_event("click", lambda *args: self.redo())
 
         return actions
 
@@ -302,10 +537,16 @@ class EditingTable(Table):
             ],
         )
 
+        # the files stay in the input once uploaded, they are only uploaded again once replaced
+        self._upload_version = self.upload_btn.file_input.version
+
         def _menu_change(change):
             if not change["new"]:  # Menu is close
-                if dfs := self.upload_btn.load_dataframes():
-                    self.df = dfs[0].lazy()
+                version = self.upload_btn.file_input.version
+                if version != self._upload_version:
+                    self._upload_version = version
+                    if dfs := self.upload_btn.scan_dataframes():
+                        self._upload(dfs[0])
                 menu.v_slots[0]["children"].color = None
             else:
                 menu.v_slots[0]["children"].color = "primary"
@@ -314,8 +555,37 @@ class EditingTable(Table):
 
         return menu
 
+    def _upload(self, df: pl.LazyFrame) -> None:
+        if self.sink is not None:
+            # for the sink, the rows of the previous table are deleted and the uploaded ones inserted
+            self.sink.delete(self.df.select(self.item_key).collect().to_series())
+        self.df = df
+        if self.sink is not None:
+            self.sink.attach(self.item_key, self.schema, self._get_rows_by_key)
+            self._create_in_sink(self.df.drop(self.row_nr))
+
+    def _create_in_sink(self, rows: pl.LazyFrame) -> None:
+        """pass `rows` to the sink by batches of max_rows (each one flushed), without collecting them at once"""
+        batch_size = self.sink.max_rows
+        if not self.is_lazy:
+            for batch in self._eager_df.drop(self.row_nr).iter_slices(batch_size):
+                self.sink.create(batch)
+            return
+        with tempfile.TemporaryDirectory(prefix="ipyvuetable-") as directory:
+            # the source is streamed once to a parquet file, each batch only reads its own row groups
+            path = Path(directory) / "rows.parquet"
+            rows.sink_parquet(path, row_group_size=batch_size)
+            rows = pl.scan_parquet(path)
+            height = rows.select(pl.len()).collect().item()
+            for offset in range(0, height, batch_size):
+                self.sink.create(rows.slice(offset, batch_size).collect())
+
     def _update_action_status(self):
         super()._update_action_status()
         self.actions["delete"]["obj"].disabled = self.nb_selected < 1
         self.actions["edit"]["obj"].disabled = self.nb_selected < 1
         self.actions["duplicate"]["obj"].disabled = self.nb_selected != 1
+        # the history is dropped when df is modified outside of apply_delta
+        is_current = self.journal.version == self.df_version
+        self.actions["undo"]["obj"].disabled = not (is_current and self.journal.undo_stack)
+        self.actions["redo"]["obj"].disabled = not (is_current and self.journal.redo_stack)
@@ -1,3 +1,5 @@
+from typing import Any
+
 import ipyvuetify as v
 import polars as pl
 
@@ -8,7 +10,11 @@ class Filter:
     def __init__(self, name, table):
         self.table: ipyvuetable.Table = table
         self.name: str = name
-        self.mask: pl.LazyFrame | None = None
+        # filter settings as a boolean expression on the columns of table.df, None if inactive
+        # the expressions of the filters are combined in Table.filter_expr and can be pushed down to a scan
+        self.expr: pl.Expr | None = None
+        self.state: Any = None  # comparable version of the filter settings, used as cache key
+        self._bitmap: tuple[Any, pl.Series] | None = None
         self.is_initialized = False
 
         self.filter_icon = v.Icon(
@@ -27,6 +33,44 @@ class Filter:
 
         self.menu.observe(self._update_selection, "v_model")
 
+    @property
+    def mask(self) -> pl.LazyFrame | None:
+        """row numbers of table.df kept by the filter"""
+        if self.expr is None:
+            return None
+        if self.table.is_lazy:
+            return self.table.df.filter(self.expr).select(self.table.row_nr)
+        return self.table._eager_df.select(self.table.row_nr).filter(self.get_bitmap()).lazy()
+
+    def get_bitmap(
+        self,
+        settings: tuple[pl.Expr, Any] | None = None,
+        df: tuple[int, pl.DataFrame] | None = None,
+    ) -> pl.Series:
+        """
+        boolean mask aligned with the rows of table.df,
+        cached until the filter settings or the df change.
+        A refresh running in background gives the (expr, state) and the (df_version, eager df) of its snapshot
+        """
+        expr, state = settings if settings is not None else (self.expr, self.state)
+        df_version, eager_df = df if df is not None else (self.table.df_version, self.table._eager_df)
+        key = (df_version, state)
+        bitmap = self._bitmap
+        if bitmap is None or bitmap[0] != key:
+            # the entry is computed from the same settings as its key
+            bitmap = key, self._compute_bitmap(expr, state, df_version, eager_df)
+            self._bitmap = bitmap
+        return bitmap[1]
+
+    def _compute_bitmap(
+        self, expr: pl.Expr, state: Any, df_version: int, eager_df: pl.DataFrame
+    ) -> pl.Series:
+        return eager_df.select(pl.coalesce(expr, False)).to_series()
+
+    def _set_expr(self, expr: pl.Expr | None, state: Any = None) -> None:
+        self.expr = expr
+        self.state = state if expr is not None else None
+
     def _update_mask(self): ...
 
     def _update_filter(self): ...
@@ -36,7 +80,7 @@ class Filter:
 
     def apply_mask(self):
         self._update_mask()
-        self.filter_icon.color = "grey" if self.mask is None else "primary"
+        self.filter_icon.color = "grey" if self.expr is None else "primary"
         self.table._apply_filters()
 
     def _update_selection(self, change):
@@ -49,4 +93,4 @@ class Filter:
 
     def _undo(self):
         self.filter_icon.color = "grey"
-        self.mask = None
+        self._set_expr(None)
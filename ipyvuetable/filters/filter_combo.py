@@ -1,18 +1,24 @@
+import threading
+import warnings
+from typing import Any
+
 import ipyvuetify as v
 import polars as pl
 
 import ipyvuetable
+import ipyvuetable.utils as utils
 from ipyvuetable.filters import Filter
 
 
 class FilterCombobox(Filter):
+    search_debounce = 0.3  # seconds without keystroke before searching
+
     def __init__(self, name, table, **kwargs):
         super().__init__(name, table, **kwargs)
 
     def init_filter(self):
         super().init_filter()
         self.row_nr = self.table.row_nr
-        self.is_select_all = False
         self.search = v.TextField(
             v_model=None,
             # append_icon="mdi-magnify",
@@ -23,6 +29,10 @@ class FilterCombobox(Filter):
             class_="pa-2",
         )
         self.undo_icon = v.Icon(children=["mdi-filter-remove"], color="grey", class_="mx-1")
+        self._search_timer: threading.Timer | None = None
+        self._search_index: pl.DataFrame | None = None  # lowercased text of the options by row_nr
+        self._last_search: tuple[str, pl.DataFrame] | None = None  # last query and its matching rows
+        self._facets_key = None  # search key of the table when the options were computed
         self.filter_obj = ipyvuetable.Table(
             item_key=self.name + "__key",
             actions_to_hide="*",
@@ -42,20 +52,45 @@ class FilterCombobox(Filter):
         self.undo_icon.on_event("click", lambda *d: self._undo())
 
     def _on_search(self, data):
+        # wait for the user to stop typing
+        if self._search_timer is not None:
+            self._search_timer.cancel()
+        self._search_timer = threading.Timer(
+            self.search_debounce, self._search_on_timer, args=(data, self.filter_obj._generation)
+        )
+        self._search_timer.start()
+
+    def _search_on_timer(self, data, generation):
+        # run by the debounce timer, under the lock of the options as they are modified by the table
+        with self.filter_obj._lock:
+            if threading.current_thread() is not self._search_timer:
+                return  # superseded by a newer keystroke or an undo
+            if generation != self.filter_obj._generation:
+                # the options were recomputed since the keystroke, wait for them to settle
+                self._on_search(data)
+                return
+            self._search_timer = None
+            self._search(data)
+
+    def _search(self, data):
         if data:
-            df_search = self.filter_obj.df.filter(
-                pl.any_horizontal(
-                    pl.exclude([self.row_nr, *self.filter_obj.columns_to_hide])
-                    .cast(pl.Utf8)
-                    .str.to_lowercase()
-                    .str.contains(data.lower(), literal=True)
-                )
-            ).collect()
+            query = data.lower()
+            # a query that extends the previous one can only match a subset of its rows
+            if self._last_search is not None and self._last_search[0] in query:
+                df_index = self._last_search[1]
+            else:
+                df_index = self._search_index
+            df_index = df_index.filter(pl.col("__search").str.contains(query, literal=True))
+            self._last_search = query, df_index
+
+            df_search = self.filter_obj._eager_df.select(pl.all().gather(df_index[self.row_nr]))
         else:
-            df_search = self.filter_obj.df.collect()
+            self._last_search = None
+            df_search = self.filter_obj._eager_df
 
         self.filter_obj.server_items_length = df_search.height
         self.filter_obj.df_search = df_search.lazy()
+        self.filter_obj._search_key = (self.filter_obj.df_version, data)
         self.filter_obj._update_df_search_sorted()
         self.filter_obj._update_items()
 
@@ -64,91 +99,161 @@ class FilterCombobox(Filter):
             self.filter_obj.page = 2
             self.filter_obj.page = 1
 
-    def _get_filter_values(self):
-        """
-        get the the list of possible values in the filter
-        """
-        other_filters = [c for c in self.table.filters if c != self.name]
-        filter_values = (
-            self.table._get_df_search(filters=other_filters)[0]
-            .unique(subset=[self.name])
-            .select(self.name, pl.lit(True).alias("__is_available"))
-        )
-
-        return filter_values
+    def _get_selected_keys(self) -> pl.Series:
+        return self.filter_obj.df_selected.select(self.name + "__key").collect().to_series()
 
     def _update_mask(self):
-        self.mask = (
-            (
-                self.table.df.join(
-                    self.filter_obj.df_selected,
-                    left_on=self.name,
-                    right_on=self.name + "__key",
-                    join_nulls=True,
-                    how="semi",
-                ).select(pl.col(self.row_nr))
-            )
-            if self.filter_obj.v_model
-            else None
-        )
+        if self.filter_obj.nb_selected:
+            keys = self._get_selected_keys()
+            expr = pl.col(self.name).is_in(keys.drop_nulls())
+            if keys.null_count():
+                expr |= pl.col(self.name).is_null()
+            self._set_expr(expr, ("is_in", keys.to_list()))
+        else:
+            self._set_expr(None)
 
     def _get_df(self):
-        # show first options that are not already discarded by the other filter
+        # show first options that are not already discarded by the other filters, with their number of rows
         filter_df_sorted = (
-            self.table.df.select([self.name])
-            .unique()
-            .join(self._get_filter_values(), on=self.name, how="left")
-            .sort("__is_available", nulls_last=True)
-            .drop("__is_available")
+            self.table.get_facets()[self.name]
+            .lazy()
+            .sort("#", descending=True, nulls_last=True, maintain_order=True)
         )
 
-        if self.name in self.table.columns_repr:
-            # remove `__repr` prefix and add `__key` suffix to the non repr column
-            df = filter_df_sorted.join(
-                self.table.columns_repr[self.name], on=self.name, how="left"
-            ).select(  # left to keep the order
+        if self.name in self.table.columns_repr_mapping:
+            # add `__key` suffix to the non repr column
+            df = filter_df_sorted.select(
                 [
                     pl.col(self.name).name.suffix("__key"),
-                    pl.col(self.name + "__repr").fill_null(pl.col(self.name)).alias(self.name),
+                    self.table.get_repr_expr(self.name),
+                    pl.col("#"),
                 ]
             )
         else:
-            df = filter_df_sorted.select([pl.col(self.name).name.suffix("__key"), pl.col(self.name)])
+            df = filter_df_sorted.select(
+                [pl.col(self.name).name.suffix("__key"), pl.col(self.name), pl.col("#")]
+            )
         return df
 
     def _update_filter(self):
-        self.filter_obj.df = self._get_df()
+        self._facets_key = self.table._get_search_key()
+        # a debounced search does not run on half-updated options
+        with self.filter_obj._lock:
+            self.filter_obj.df = self._get_df()
+
+            # the options are lowercased once, not on each keystroke, with the text of the table-wide search
+            dtype = self.filter_obj.schema[self.name]
+            if isinstance(dtype, (pl.List, pl.Array, pl.Struct, pl.Object, pl.Binary)):
+                text = self._get_text_expr(dtype).str.to_lowercase()
+            else:
+                text = utils.TrigramIndex.get_text_expr(self.name, dtype)
+            self._search_index = self.filter_obj._eager_df.select(self.row_nr, text.alias("__search"))
+            self._last_search = None
+
+    def _get_text_expr(self, dtype: pl.DataType) -> pl.Expr:
+        """searched text of the options that can't be cast to string, encoded by polars except for objects and bytes"""
+        col = pl.col(self.name)
+        if isinstance(dtype, pl.Struct):
+            return col.struct.json_encode()
+        if isinstance(dtype, (pl.List, pl.Array)):
+            # json of a struct with a single field, without the field name
+            text = pl.struct(col.alias("_")).struct.json_encode().str.slice(len('{"_":')).str.head(-1)
+            return pl.when(col.is_not_null()).then(text)
+        # the python representation of the objects and of the bytes is searched, a cast of bytes fails on invalid utf8
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", pl.exceptions.PolarsInefficientMapWarning)
+            return col.map_elements(str, return_dtype=pl.Utf8)
+
+    def _update_selection(self, change):
+        # the counts depend on the other filters, refresh them if they changed since the last opening
+        if change["new"] and self.is_initialized and self._facets_key != self.table._get_search_key():
+            self._update_filter()
+        super()._update_selection(change)
 
     def _undo(self):
         super()._undo()
+        with self.filter_obj._lock:
+            if self._search_timer is not None:
+                self._search_timer.cancel()
+                self._search_timer = None
         self.search.v_model = None
-        self.filter_obj.v_model = []
-        self._on_search(None)
+        self.filter_obj.clear_selection()
+        self._search(None)
 
     def modify_filter(self, values):
         """
         used to pre-define the filter
         """
 
-        if not hasattr(self, "filter_obj"):
+        if not self.is_initialized:
             self.init_filter()
+            self._update_filter()
 
-        self.filter_obj.v_model = [
-            item for item in self.filter_obj.items if item[self.name + "__key"] in values
-        ]
+        self.filter_obj.select(values)
         self._update_mask()
 
         return self
 
 
 class FilterListCombobox(FilterCombobox):
+    """filter the rows whose list contains any (or all) of the selected elements, null matches empty lists"""
+
     def __init__(self, name, table, **kwargs):
         super().__init__(name, table, **kwargs)
+        self._index: tuple[int, pl.DataFrame] | None = None  # (df_version, row numbers by list element)
+
+    def init_filter(self):
+        super().init_filter()
+        self.mode = v.BtnToggle(
+            v_model="any",
+            mandatory=True,
+            dense=True,
+            class_="mx-1",
+            children=[
+                v.Btn(small=True, value="any", children=["any"]),
+                v.Btn(small=True, value="all", children=["all"]),
+            ],
+        )
+        self.card.children[0].children = [self.search, self.mode, self.undo_icon]
 
     def _update_mask(self):
-        ...
-        # TODO
+        if self.filter_obj.nb_selected:
+            keys = self._get_selected_keys()
+            mode = self.mode.v_model
+            col = pl.col(self.name)
+            exprs = [col.list.contains(key).fill_null(False) for key in keys.drop_nulls()]
+            if keys.null_count():
+                is_empty = (col.list.len() == 0) | col.list.eval(pl.element().is_null()).list.any()
+                exprs.append(is_empty.fill_null(True))
+            expr = pl.any_horizontal(exprs) if mode == "any" else pl.all_horizontal(exprs)
+            self._set_expr(expr, (mode, keys.to_list()))
+        else:
+            self._set_expr(None)
 
-    def _get_filter_values(self):
-        ...
-        # TODO
+    def _get_index(self, df_version: int, eager_df: pl.DataFrame) -> pl.DataFrame:
+        """row numbers of table.df by list element, built once per df"""
+        index = self._index
+        if index is None or index[0] != df_version:
+            index = (
+                df_version,
+                eager_df.select(self.row_nr, pl.col(self.name).list.unique())
+                .explode(self.name)
+                .group_by(self.name)
+                .agg(self.row_nr),
+            )
+            self._index = index
+        return index[1]
+
+    def _compute_bitmap(
+        self, expr: pl.Expr, state: Any, df_version: int, eager_df: pl.DataFrame
+    ) -> pl.Series:
+        # answered by the index, the list column is not exploded on each filter change
+        mode, keys = state
+        row_nrs = (
+            self._get_index(df_version, eager_df)
+            .filter(pl.col(self.name).is_in(keys, nulls_equal=True))
+            .select(pl.col(self.row_nr).explode())
+        )
+        if mode == "all":
+            row_nrs = row_nrs.group_by(self.row_nr).len().filter(pl.col("len") == len(keys))
+        return eager_df.select(pl.col(self.row_nr).is_in(row_nrs[self.row_nr])).to_series()
@@ -44,20 +44,21 @@ class FilterDate(Filter):
                     or self.default_range[1] > max_date + datetime.timedelta(days=1)
                 )
             ):
-                self.mask = self.table.df.filter(
-                    pl.col(self.name).is_between(min_date, max_date, closed="both")
-                ).select(self.table.row_nr)
+                self._set_expr(
+                    pl.col(self.name).is_between(min_date, max_date, closed="both"),
+                    ("between", min_date, max_date),
+                )
                 self.undo_icon.color = "primary"
                 return
 
-        self.mask = None
+        self._set_expr(None)
         self.undo_icon.color = "grey"
 
     def _update_filter(self):
-        min_ = self.table.df.select(self.name).min().collect().item()
-        max_ = self.table.df.select(self.name).max().collect().item()
+        stats = self.table.get_column_stats()[self.name]
+        min_, max_ = stats["min"], stats["max"]
 
-        self.default_range = [min_, max_] if min is not None else None
+        self.default_range = [min_, max_] if min_ is not None else None
 
         # set default values if needed
         if self.min_field.v_model is None and self.max_field.v_model is None:
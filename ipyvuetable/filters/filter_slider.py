@@ -1,3 +1,6 @@
+import math
+from typing import Any, Literal
+
 import ipyvuetify as v
 import polars as pl
 
@@ -5,21 +8,31 @@ from ipyvuetable.filters import Filter
 
 
 class FilterSlider(Filter):
+    nb_bins = 50
+    binning: Literal["fixed", "quantile"] = "fixed"  # equal width bins or bins of equal number of rows
+
     def __init__(self, name, table, **kwargs):
         super().__init__(name, table, **kwargs)
+        self._edges: tuple[int, list[float]] | None = None  # (df_version, bin edges)
+        self._counts: list[int] = []  # number of rows by bin under all the other filters
+        self._histogram_key: Any = None  # search key of the table, without this filter, of _counts
 
     def init_filter(self):
         super().init_filter()
         self.max_field = v.TextField(v_model=None, class_="pa-2", label="max", type="number")
         self.min_field = v.TextField(v_model=None, class_="pa-2", label="min", type="number")
         self.undo_icon = v.Icon(children=["mdi-undo-variant"], color="grey")
-        self.filter_obj = v.RangeSlider(v_model=None, class_="align-center")
+        self.filter_obj = v.RangeSlider(v_model=None, class_="align-center", hide_details=True)
+        self.sparkline = v.Sparkline(
+            value=[], type="bar", auto_line_width=True, padding=0, height=40, color="grey"
+        )
+        self.preview = v.Html(tag="div", class_="caption text-center grey--text", children=[])
 
         self.card.children = [
             v.Row(
                 children=[
                     v.Col(cols=3, children=[self.min_field]),
-                    v.Col(cols=4, children=[self.filter_obj]),
+                    v.Col(cols=4, children=[self.sparkline, self.filter_obj, self.preview]),
                     v.Col(cols=3, children=[self.max_field]),
                     v.Col(children=[self.undo_icon]),
                 ]
@@ -34,6 +47,7 @@ class FilterSlider(Filter):
     def __on_change_filter_obj_v_model(self, change):
         if isinstance(change["new"], list):
             self.min_field.v_model, self.max_field.v_model = change["new"]
+            self._update_preview()
         else:
             self.filter_obj.v_model = [self.filter_obj.min, self.filter_obj.max]
 
@@ -52,26 +66,118 @@ class FilterSlider(Filter):
                 self.filter_obj.v_model[1] = int(data)
 
     def _update_mask(self):
-        self.mask = (
-            (
-                self.table.df.filter(pl.col(self.name).is_between(*self.filter_obj.v_model)).select(
-                    self.table.row_nr
-                )
-            )
-            if self.filter_obj.v_model
-            and self.filter_obj.v_model != [self.filter_obj.min, self.filter_obj.max]
-            else None
-        )
+        if self.filter_obj.v_model and self.filter_obj.v_model != [self.filter_obj.min, self.filter_obj.max]:
+            min_, max_ = self.filter_obj.v_model
+            self._set_expr(pl.col(self.name).is_between(min_, max_), ("between", min_, max_))
+        else:
+            self._set_expr(None)
 
-        self.undo_icon.color = "grey" if self.mask is None else "primary"
+        self.undo_icon.color = "grey" if self.expr is None else "primary"
 
     def _update_filter(self):
-        self.filter_obj.min = self.table.df.select(pl.col(self.name).min().floor()).collect().item()
-        self.filter_obj.max = self.table.df.select(pl.col(self.name).max().ceil()).collect().item()
+        stats = self.table.get_column_stats()[self.name]
+        self.filter_obj.min = None if stats["min"] is None else math.floor(stats["min"])
+        self.filter_obj.max = None if stats["max"] is None else math.ceil(stats["max"])
 
         if self.filter_obj.v_model is None:
             self.filter_obj.v_model = [self.filter_obj.min, self.filter_obj.max]
 
+        self._update_histogram()
+
+    def _update_selection(self, change):
+        # the histogram depends on the other filters, refresh it if they changed since the last opening
+        if change["new"] and self.is_initialized and self._histogram_key != self._get_histogram_key():
+            self._update_histogram()
+        super()._update_selection(change)
+
+    def _get_histogram_key(self) -> Any:
+        df_version, filters_state, *others = self.table._get_search_key()
+        return df_version, [state for state in filters_state if state[0] != self.name], *others
+
+    def _get_values(self) -> pl.Expr:
+        """values of the column, NaN are not kept by the slider and are dropped like nulls"""
+        col = pl.col(self.name)
+        return col.fill_nan(None) if self.table.schema[self.name].is_float() else col
+
+    def _get_edges(self) -> list[float]:
+        """bin edges of the column, computed once per df"""
+        if self._edges is None or self._edges[0] != self.table.df_version:
+            stats = self.table.get_column_stats()[self.name]
+            if stats["min"] is None:
+                edges = []
+            elif self.binning == "quantile":
+                quantiles = [i / self.nb_bins for i in range(self.nb_bins + 1)]
+                row = self.table.df.select(
+                    self._get_values().quantile(q).alias(str(i)) for i, q in enumerate(quantiles)
+                ).collect()
+                edges = row.row(0)
+            else:
+                width = (stats["max"] - stats["min"]) / self.nb_bins
+                edges = [stats["min"] + i * width for i in range(self.nb_bins)] + [stats["max"]]
+            edges = sorted(set(edges))
+            if len(edges) == 1:  # constant column, a single bin
+                edges *= 2
+            self._edges = self.table.df_version, edges
+        return self._edges[1]
+
+    def _update_histogram(self):
+        """count the rows of each bin kept by the other filters, in one scan"""
+        self._histogram_key = self._get_histogram_key()
+        edges = self._get_edges()
+        nb_bins = max(len(edges) - 1, 1)
+        self._counts = [0] * nb_bins
+        if edges:
+            others = [name for name in self.table.filters if name != self.name]
+            counts = (
+                self.table.df.select(
+                    (pl.lit(pl.Series(edges)).search_sorted(pl.col(self.name), side="right") - 1)
+                    .clip(0, nb_bins - 1)
+                    .alias("bin"),
+                    (
+                        self.table._get_search_mask_expr(filters=others) & self._get_values().is_not_null()
+                    ).alias("#"),
+                )
+                .group_by("bin")
+                .agg(pl.col("#").sum())
+                .collect()
+            )
+            for bin_, count in counts.iter_rows():
+                self._counts[bin_] = count
+
+        self.sparkline.value = self._counts
+        self._update_preview()
+
+    def _update_preview(self):
+        """
+        number of rows kept by the slider, from the histogram without scanning the table:
+        exact when the slider does not cut a bin, estimated otherwise
+        """
+        edges = self._get_edges()
+        if not edges or not isinstance(self.filter_obj.v_model, list):
+            self.preview.children = []
+            return
+
+        min_, max_ = self.filter_obj.v_model
+        if min_ <= edges[0] and max_ >= edges[-1]:
+            self.preview.children = [f"{sum(self._counts):,} rows match"]
+            return
+
+        nb_rows = 0.0
+        is_exact = True
+        # a bin holds the values in [low, high), the last one also holds the maximum
+        for i, (low, high, count) in enumerate(zip(edges, edges[1:], self._counts)):
+            is_last = i == len(self._counts) - 1
+            if min_ <= low and high <= max_:
+                nb_rows += count
+            elif (high < min_ if is_last else high <= min_) or max_ < low or not count:
+                continue
+            elif high > low:
+                # rows are assumed to be uniformly distributed inside a cut bin
+                nb_rows += count * min(max((min(high, max_) - max(low, min_)) / (high - low), 0), 1)
+                is_exact = False
+        nb_rows = round(nb_rows)
+        self.preview.children = [f"{nb_rows:,} rows match" if is_exact else f"about {nb_rows:,} rows match"]
+
     def _undo(self):
         super()._undo()
         self.filter_obj.v_model = None
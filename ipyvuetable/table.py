@@ -1,7 +1,9 @@
 import base64
 import io
+import operator
+import threading
 from functools import reduce
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
 
 import ipyvuetify as v
 import ipywidgets as ipw
@@ -24,6 +26,21 @@ from ipyvuetable.filters import (
 )
 
 
+class SearchSnapshot(NamedTuple):
+    """
+    settings of a search taken under the lock: a refresh running in background works on them,
+    not on the filters that can be changed in the meantime
+    """
+
+    df_version: int
+    df: pl.LazyFrame
+    df_height: int
+    eager_df: pl.DataFrame | None
+    filters: list[tuple[Filter, pl.Expr, Any]]  # active filters with their expr and state
+    search_query: str | None
+    selected: pl.LazyFrame | None  # selected row numbers (item_key in lazy mode) if filter_on_selected
+
+
 class DataTableEnhanced(v.DataTable):
     def __init__(self, max_height: int | None = 500, show_filters: bool = True, **kwargs: Any):
         super().__init__(**kwargs)
@@ -56,34 +73,49 @@ class DataTableEnhanced(v.DataTable):
         self.__dict__["_trait_values"]["sort_by"] = data["sortBy"]
         self.__dict__["_trait_values"]["sort_desc"] = data["sortDesc"]
 
+        self._on_change_options(previous_sort_by != data["sortBy"] or previous_sort_desc != data["sortDesc"])
+
+    def _on_change_options(self, is_sort_changed: bool) -> None:
         # sort if needed
-        if previous_sort_by != data["sortBy"] or previous_sort_desc != data["sortDesc"]:
+        if is_sort_changed:
             self._update_df_search_sorted()
 
         self._update_items()
 
     def _on_change_items(self, *change):
+        items_per_page = int(self.items_per_page) if self.items_per_page is not None else None
+        self._update_height(len(self.items[:items_per_page]))
+
+    def _update_height(self, nrow: int) -> None:
         if self.max_height is not None:
-            items_per_page = int(self.items_per_page) if self.items_per_page is not None else None
-            h = self._get_current_height(len(self.items[:items_per_page]))
+            h = self._get_current_height(nrow)
             self.height = None if h <= self.max_height else self.max_height
 
     def _get_current_height(self, nrow):
-        if self.dense:
-            row_height = filter_height = 25
-            header_height = 32
-        else:
-            row_height = filter_height = header_height = 48
+        row_height, filter_height, header_height = self._get_rows_height()
         return nrow * row_height + filter_height * self.show_filters + header_height
 
+    def _get_rows_height(self) -> tuple[int, int, int]:
+        """height in px of a row, of the filters row and of the header"""
+        if self.dense:
+            return 25, 25, 32
+        return 48, 48, 48
+
 
 class Table(DataTableEnhanced):
     df_height: int
     df_search: pl.LazyFrame  # dataframe resulting of the filters
-    df_search_sorted: pl.LazyFrame  # dataframe resulting of the sort
+    sort_permutation: pl.Series | None  # row numbers of df_search in the sorted order, None if not sorted
     df_paginated: pl.LazyFrame  # dataframe rendered based on the panigation
     nb_selected = t.Int(0).tag(sync=True)
     last_selected_key = None
+    sort_cache_size = 4  # number of sort permutations kept in memory
+    page_cache_size = 16  # number of rendered pages kept in memory
+    top_k_max_rows = 10_000  # beyond this number of rows to display, df_search is fully sorted
+    virtual_scroll_buffer = (
+        20  # minimum number of rows rendered above and below the viewport in virtual scroll mode
+    )
+    search_debounce = 0.3  # seconds without keystroke before the table-wide search
 
     def __init__(
         self,
@@ -94,6 +126,10 @@ class Table(DataTableEnhanced):
         columns_repr: dict[str, pl.LazyFrame] = {},
         columns_to_hide: list[str] = [],
         actions_to_hide: list[str] | Literal["*"] = [],
+        virtual_scroll: bool = False,
+        transport: Literal["json", "columnar"] = "json",
+        lazy: bool = False,
+        background: bool = False,
         **kwargs: Any,
     ):
         super().__init__(**kwargs)
@@ -115,12 +151,49 @@ class Table(DataTableEnhanced):
 
         self.row_nr = "__row_nr__"
         self.item_key = self.row_nr if item_key is None else item_key
+        # in lazy mode, df is never collected: pages, heights and filter options are pushed down to the source,
+        # the filters are pushed down to the scans of the source so that they can skip data,
+        # the row numbers are still the ones of the unfiltered source so that the selection survives the filters
+        self.is_lazy = lazy
+        self._source: pl.LazyFrame | None = None  # df without row numbers in lazy mode
+        # in background mode, filters, sorts and page changes are computed on the executor,
+        # each request supersedes the previous ones and only the latest result is applied
+        self.background = background
+        self._generation = 0  # incremented by each request, identify the latest one
+        self._is_search_pending = False  # a filter change is not applied yet
+        self._lock = threading.RLock()
         self.is_select_all = False
         self.filter_on_selected = False
-        self.selected_keys = []
+        # the selection lives on the server as the sorted row numbers of the selected rows and their item_key values,
+        # only the selected rows of the current page are synced to the frontend v_model
+        self.selection = pl.Series(self.row_nr, [], dtype=pl.UInt32)
+        self._selected_keys = pl.Series(self.item_key, [])
+        self._selection_version = 0  # incremented each time the selection is modified
+        # in select-all mode, all the rows of df_search are selected except the excluded ones,
+        # df_search is kept as it was when all was selected and is never sent to the frontend
+        self.excluded = pl.Series(self.row_nr, [], dtype=pl.UInt32)
+        self._select_all_search: tuple[pl.LazyFrame, int] | None = None  # (df_search, height)
 
         self.toolbar_title = v.ToolbarTitle(children=[title] if title else [])
         self.filters_row = v.Html(tag="tr")  # type: ignore
+
+        # in virtual scroll mode, only the visible rows are rendered between two spacers
+        # the footer is replaced by the scroll bar of the table
+        self.virtual_scroll = virtual_scroll
+        self.window_start = 0  # index of the first rendered row in virtual scroll mode
+        self.top_spacer = v.Html(tag="tr", class_="virtual_spacer")  # type: ignore
+        self.bottom_spacer = v.Html(tag="tr", class_="virtual_spacer")  # type: ignore
+        # with the columnar transport, items are sent as a binary buffer and decoded by the frontend
+        self.transport = transport
+        self.columnar_items = utils.ColumnarItems(table=self) if transport == "columnar" else None
+
+        if virtual_scroll:
+            self.hide_default_footer = True
+            self.disable_pagination = True
+            self.fixed_header = True
+            self.height = self.max_height or 500
+            self.max_height = None
+            self.add_class("virtual_scroll")
         self.unselect = v.Icon(children=["mdi-close"], color="primary", disabled=True, class_="pt-1")
         self.badge = v.Badge(
             v_model=not kwargs.get("single_select", False),
@@ -146,7 +219,23 @@ class Table(DataTableEnhanced):
         )
 
         self.filters: dict[str, Filter] = {}
+        self.search_query: str | None = None  # lowercased query of the table-wide search
+        self._search_timer: threading.Timer | None = None
+        self._text_index: tuple[int, utils.TrigramIndex] | None = (
+            None  # (df_version, index), built on first search
+        )
+        self._text_index_version = -1  # df_version of the last index build
+        self._facets: tuple[Any, dict[str, pl.DataFrame]] | None = (
+            None  # (search key, facets of the comboboxes)
+        )
+        self._column_stats: tuple[int, dict[str, dict[str, Any]]] | None = None  # (df_version, stats)
+        self._key_index: tuple[int, pl.DataFrame] | None = None  # (df_version, item_key index)
         self.schema: dict[str, pl.DataType] = {}
+        self.df_version = 0  # incremented each time df is modified
+        self._search_key: Any = None  # identify the df and filters state of df_search
+        self._sort_key: tuple[tuple[str, ...], tuple[bool, ...]] | None = None
+        self._sort_cache = utils.LRUCache(self.sort_cache_size)  # (permutation, is_complete) by sort state
+        self._page_cache = utils.LRUCache(self.page_cache_size)  # (df_paginated, items) by page state
         self.custom_actions = self._get_custom_actions()  # could be defined be subclasses
         self.payload = None  # the payload to be downloaded
         self.actions = self._get_actions()
@@ -167,8 +256,8 @@ class Table(DataTableEnhanced):
             if Event is not None
             else None
         )
-        self.selected_indices: set[int] = set()
-        self.last_selected_index: int = -1
+        # (search key, sort key, position in df_search_sorted) of the last row selected by a click
+        self._last_selected_position: tuple[Any, Any, int] | None = None
 
         # v_slots not not work properly with ipyvuetity table
         # to be able to add extra elements beloz the table
@@ -178,7 +267,10 @@ class Table(DataTableEnhanced):
         # if you want to activate ipyevents features, use the `ui` attribute
         # https://github.com/widgetti/ipyvuetify/issues/216
 
-        self.ui = ipw.VBox(children=[self, self.bottom_widget])
+        # the virtual scroller needs to be displayed to report the scroll position:
+        # displaying the table displays `ui`, a table nested in another widget has to be nested through `ui`
+        self.virtual_scroller = utils.VirtualScroller(table=self) if virtual_scroll else None
+        self.ui = ipw.VBox(children=[self.virtual_scroller or self, self.bottom_widget])
 
         ipw.jslink(
             (self.columns_to_display_search, "v_model"),
@@ -186,7 +278,9 @@ class Table(DataTableEnhanced):
         )
 
         self.on_event("input", self._on_input_table)
+        self.on_event("toggle-select-all", self._on_toggle_select_all)
         self.unselect.on_event("click", self._on_click_unselect)
+        self.actions["search"]["obj"].on_event("input", self._on_search)
         self.actions["undo_filters"]["obj"].on_event("click", self._undo_all_filters)
         self.actions["multi_sort"]["obj"].on_event("click", self._toggle_multi_sort)
         self.observe(self.on_nb_selected, "nb_selected")
@@ -194,6 +288,14 @@ class Table(DataTableEnhanced):
         self.actions["filter_on_selected"]["obj"].on_event("click", self._fiter_on_selected)
         if self.click_event:
             self.click_event.on_dom_event(self._update_event)
+        if self.virtual_scroller:
+            self.virtual_scroller.observe(self._on_scroll, "scroll_top")
+
+    def _repr_mimebundle_(self, **kwargs: Any) -> dict[str, Any] | None:
+        # in virtual scroll mode, the scroll position is only reported through the scroller of `ui`
+        if self.virtual_scroller is not None:
+            return self.ui._repr_mimebundle_(**kwargs)
+        return super()._repr_mimebundle_(**kwargs)
 
     def _update_event(self, event):
         self.event = event
@@ -203,6 +305,18 @@ class Table(DataTableEnhanced):
 
     def _get_actions(self) -> dict[str, dict[str, Any]]:
         actions = {}
+        actions["search"] = {
+            "obj": v.TextField(
+                v_model=None,
+                prepend_inner_icon="mdi-magnify",
+                label="Search ...",
+                single_line=True,
+                dense=True,
+                hide_details=True,
+                clearable=True,
+                class_="pa-2",
+            ),
+        }
         actions["undo_filters"] = {
             "obj": v.Icon(children=["mdi-filter-remove"]),
             "tooltip": "Undo all filters",
@@ -263,24 +377,328 @@ class Table(DataTableEnhanced):
     def df(self) -> pl.LazyFrame:
         return self._df
 
+    @property
+    def columns_repr(self) -> dict[str, pl.LazyFrame]:
+        return self._columns_repr
+
+    @columns_repr.setter
+    def columns_repr(self, columns_repr: dict[str, pl.LazyFrame]) -> None:
+        self._columns_repr = columns_repr
+        # compile once the repr frames into mappings shared by the pages, the filters and the dialogs
+        self.columns_repr_mapping: dict[str, pl.DataFrame] = {
+            c: df_repr.select(pl.col(c), pl.col(c + "__repr").cast(pl.Utf8))
+            .drop_nulls(c)
+            .unique(subset=c, keep="first", maintain_order=True)
+            .collect()
+            for c, df_repr in columns_repr.items()
+        }
+        self._columns_repr_version = getattr(self, "_columns_repr_version", 0) + 1
+
     @df.setter
     def df(self, df: pl.LazyFrame) -> None:
         df = self.on_df_change(df)
         self._update_df(df)
 
+    def apply_delta(
+        self,
+        inserted: pl.DataFrame | pl.LazyFrame | None = None,
+        updated: pl.DataFrame | pl.LazyFrame | None = None,
+        deleted_keys: list[Any] | pl.Series | None = None,
+        on: str | None = None,
+        positions: list[int] | pl.Series | None = None,
+    ) -> None:
+        """
+        patch df in place instead of re-assigning it:
+        - `deleted_keys` are values of `item_key` to remove
+        - `updated` rows are matched on `on` (default to `item_key`), only the given columns are modified
+        - `inserted` rows are appended at the end of df, or inserted at the row numbers `positions` if given
+
+        The cached eager df, the row numbers, the filters and the current page are patched,
+        only a schema change (or a custom `on_df_change`) triggers the full `_update_df` pipeline.
+        """
+        on = self.item_key if on is None else on
+        # the delta follows the dtypes of df, only new columns change the schema
+        inserted, updated = (
+            None
+            if delta is None
+            else delta.cast({c: dtype for c, dtype in self.schema.items() if c in delta.columns})
+            for delta in [utils.to_eager(inserted), utils.to_eager(updated)]
+        )
+        if positions is not None and inserted is not None:
+            # the rows are inserted in the order of their positions
+            positions = pl.Series(self.row_nr, positions, dtype=pl.UInt32)
+            order = positions.arg_sort()
+            inserted, positions = inserted[order], positions.gather(order)
+
+        is_schema_change = any(
+            c not in self.schema and c not in (self.row_nr, on)
+            for delta in [inserted, updated]
+            if delta is not None
+            for c in delta.columns
+        )
+        if is_schema_change or type(self).on_df_change is not Table.on_df_change or self.is_lazy:
+            df = self.df
+            if deleted_keys is not None:
+                df = df.filter(~pl.col(self.item_key).is_in(pl.Series(deleted_keys)))
+            if updated is not None:
+                df = df.update(updated.lazy(), on=on, include_nulls=True)
+            if inserted is not None:
+                df, inserted = df.select(*self.schema), inserted.lazy().select(pl.exclude(self.row_nr))
+                if positions is not None:
+                    row_nrs = self._get_shifted_row_nrs(pl.int_range(pl.len(), dtype=pl.UInt32), positions)
+                    df = df.with_columns(row_nrs.alias(self.row_nr))
+                    inserted = inserted.with_columns(pl.lit(positions).alias(self.row_nr))
+                df = pl.concat([df, inserted], how="diagonal_relaxed")
+                if positions is not None:
+                    df = df.sort(self.row_nr).drop(self.row_nr)
+            self.df = df
+            return
+
+        eager_df = self._eager_df
+        # the item_key index is patched along with df instead of being rebuilt
+        key_index = self._key_index[1] if self._key_index and self._key_index[0] == self.df_version else None
+        is_renumbered = False
+        if deleted_keys is not None and len(deleted_keys):
+            if key_index is not None:
+                deleted_row_nrs = self._lookup_row_nrs(deleted_keys).sort()
+                key_index = key_index.filter(~pl.col(self.row_nr).is_in(deleted_row_nrs)).with_columns(
+                    pl.col(self.row_nr)
+                    - pl.lit(deleted_row_nrs).search_sorted(pl.col(self.row_nr)).cast(pl.UInt32)
+                )
+            eager_df = eager_df.filter(~pl.col(self.item_key).is_in(pl.Series(deleted_keys))).with_columns(
+                pl.int_range(pl.len(), dtype=pl.UInt32).alias(self.row_nr)
+            )
+            is_renumbered = True
+
+        if updated is not None and updated.height:
+            if on != self.row_nr:
+                updated = updated.select(pl.exclude(self.row_nr))
+            if on != self.item_key and self.item_key in updated.columns:
+                key_index = None  # the keys themselves are modified
+            eager_df = eager_df.update(updated, on=on, include_nulls=True)
+
+        if inserted is not None and inserted.height:
+            if positions is None:
+                row_nrs = pl.int_range(pl.len(), dtype=pl.UInt32) + eager_df.height
+            else:
+                # the other rows make room for the inserted ones
+                row_nrs = pl.lit(positions)
+                eager_df = eager_df.with_columns(self._get_shifted_row_nrs(pl.col(self.row_nr), positions))
+                if key_index is not None:
+                    key_index = key_index.with_columns(
+                        self._get_shifted_row_nrs(pl.col(self.row_nr), positions)
+                    )
+                is_renumbered = True
+            inserted = inserted.select(
+                row_nrs.alias(self.row_nr),
+                *[
+                    pl.col(c) if c in inserted.columns else pl.lit(None, dtype=dtype).alias(c)
+                    for c, dtype in self.schema.items()
+                ],
+            )
+            eager_df = pl.concat([eager_df, inserted])
+            if positions is not None:
+                eager_df = eager_df.sort(self.row_nr)
+            if key_index is not None:
+                key_index = key_index.merge_sorted(
+                    inserted.select(self.item_key, self.row_nr).sort(self.item_key), key=self.item_key
+                )
+
+        self._set_df(eager_df)
+        if key_index is not None:
+            self._key_index = self.df_version, key_index
+        self._align_selection(is_renumbered)
+
+        # only filters on modified columns need new options, deleted rows can remove options of any column
+        modified_columns = {
+            c for delta in [inserted, updated] if delta is not None and delta.height for c in delta.columns
+        }
+        has_deleted = deleted_keys is not None and len(deleted_keys) > 0
+        self._update_all_filters(columns=None if has_deleted else modified_columns)
+        self._update_df_search()
+        self._update_items()
+
+    @staticmethod
+    def _get_shifted_row_nrs(row_nrs: pl.Expr, positions: pl.Series) -> pl.Expr:
+        """new `row_nrs` of the rows of df once rows are inserted at the sorted row numbers `positions`"""
+        # the i-th inserted row comes after positions[i] - i rows of df
+        nb_rows_before = (positions - pl.int_range(len(positions), dtype=pl.UInt32, eager=True)).cast(
+            pl.UInt32
+        )
+        return row_nrs + pl.lit(nb_rows_before).search_sorted(row_nrs, side="right").cast(pl.UInt32)
+
     @property
     def df_selected(self) -> pl.LazyFrame:
-        if any(row[self.row_nr] is None for row in self.v_model):
-            filter_expr = (
-                pl.col(self.row_nr).is_in(
-                    [row[self.row_nr] for row in self.v_model if row[self.row_nr] is not None]
-                )
-                | pl.col(self.row_nr).is_null()
+        if self.is_select_all:
+            df_search, _ = self._select_all_search
+            return df_search.filter(~pl.col(self.row_nr).is_in(self.excluded))
+        if self.is_lazy:
+            return self.df.filter(pl.col(self.row_nr).is_in(self.selection))
+        return self._eager_df.select(pl.all().gather(self.selection)).lazy()
+
+    def select(self, keys: list[Any] | pl.Series) -> None:
+        """select the rows whose item_key is in `keys`, in place of the current selection"""
+        self._set_selection(self._lookup_row_nrs(keys))
+        if self.filter_on_selected:
+            self._apply_filters()
+
+    def select_all(self) -> None:
+        """select all the rows of df_search, they are counted but never collected nor sent to the frontend"""
+        self._set_selection(self.selection.clear())
+        self.is_select_all = True
+        self._select_all_search = self.df_search, int(self.server_items_length)
+        self._on_selection_change()
+        if self.filter_on_selected:
+            self._apply_filters()
+
+    def clear_selection(self) -> None:
+        self._set_selection(self.selection.clear())
+        if self.filter_on_selected:
+            self._apply_filters()
+
+    @property
+    def selected_keys(self) -> pl.Series:
+        """item_key values of the selected rows, collected on demand in select-all mode"""
+        if self.is_select_all:
+            return self.df_selected.select(self.item_key).collect().to_series()
+        return self._selected_keys
+
+    def _get_selected_row_nrs(self) -> pl.Series:
+        """sorted row numbers of the selected rows, collected on demand in select-all mode"""
+        if self.is_select_all:
+            return self.df_selected.select(self.row_nr).collect().to_series()
+        return self.selection
+
+    def _get_rows_by_key(self, keys: pl.Series) -> pl.DataFrame:
+        """rows of df (without row numbers) whose item_key is in `keys`"""
+        if self.is_lazy:
+            return self.df.filter(pl.col(self.item_key).is_in(keys)).drop(self.row_nr).collect()
+        return self._eager_df.select(pl.all().gather(self._lookup_row_nrs(keys))).drop(self.row_nr)
+
+    def _get_key_index(self) -> pl.DataFrame:
+        """eager mode: item_key and row numbers of df sorted by item_key, built once per df and patched by apply_delta"""
+        if self._key_index is None or self._key_index[0] != self.df_version:
+            self._key_index = (
+                self.df_version,
+                self._eager_df.select(self.item_key, self.row_nr).sort(self.item_key),
             )
+        return self._key_index[1]
 
+    def _lookup_row_nrs(self, keys: list[Any] | pl.Series) -> pl.Series:
+        """
+        row numbers of the rows whose item_key is in `keys`, item_key is expected to be unique
+        """
+        keys = pl.Series(self.item_key, keys)
+        if self.is_lazy:
+            return (
+                self.df.filter(pl.col(self.item_key).is_in(keys, nulls_equal=True))
+                .select(self.row_nr)
+                .collect()
+                .to_series()
+            )
+
+        if self.item_key == self.row_nr:
+            row_nrs = keys.cast(pl.UInt32, strict=False).drop_nulls()
+            return row_nrs.filter(row_nrs < self.df_height)
+
+        # binary search of the keys in the sorted index instead of a scan of df
+        index = self._get_key_index()
+        if not index.height:
+            return pl.Series(self.row_nr, [], dtype=pl.UInt32)
+        dtype = index.schema[self.item_key]
+        if keys.dtype != dtype:
+            keys = keys.cast(dtype, strict=False)
+        not_null = keys.drop_nulls()
+        positions = index.select(pl.col(self.item_key).search_sorted(not_null)).to_series()
+        row_nrs = (
+            index.select(pl.all().gather(positions.clip(upper_bound=index.height - 1)))
+            .filter(pl.col(self.item_key) == pl.lit(not_null))
+            .get_column(self.row_nr)
+        )
+        if keys.null_count():
+            # nulls are sorted first
+            nb_nulls = index.get_column(self.item_key).null_count()
+            row_nrs = pl.concat([index.get_column(self.row_nr).head(nb_nulls), row_nrs])
+        return row_nrs
+
+    def _set_selection(self, row_nrs: pl.Series, known_rows: pl.DataFrame | None = None) -> None:
+        """
+        replace the selection by the rows `row_nrs`, leaving the select-all mode.
+        In lazy mode, the item_key of the `known_rows` (row_nr and item_key of the current df) is not read from the source
+        """
+        self.is_select_all = False
+        self._select_all_search = None
+        self.excluded = self.excluded.clear()
+        self.selection = row_nrs.cast(pl.UInt32).unique().sort().rename(self.row_nr)
+        if self.item_key == self.row_nr:
+            self._selected_keys = self.selection
+        elif self.is_lazy:
+            self._selected_keys = self._get_lazy_selected_keys(known_rows)
         else:
-            filter_expr = pl.col(self.row_nr).is_in([row[self.row_nr] for row in self.v_model])
-        return self.df.filter(filter_expr)
+            self._selected_keys = self._eager_df.get_column(self.item_key).gather(self.selection)
+        self._on_selection_change()
+
+    def _get_lazy_selected_keys(self, known_rows: pl.DataFrame | None) -> pl.Series:
+        """lazy mode: item_key of the selection, only the rows missing from `known_rows` are read from the source"""
+        rows = pl.DataFrame(schema={self.row_nr: pl.UInt32, self.item_key: self.schema[self.item_key]})
+        if known_rows is not None:
+            rows = pl.concat([rows, known_rows.cast({self.row_nr: pl.UInt32})])
+            rows = rows.filter(pl.col(self.row_nr).is_in(self.selection)).unique(self.row_nr)
+        missing = self.selection.filter(~self.selection.is_in(rows.get_column(self.row_nr)))
+        if len(missing):
+            df_missing = self.df.filter(pl.col(self.row_nr).is_in(missing)).select(self.row_nr, self.item_key)
+            rows = pl.concat([rows, df_missing.collect().cast({self.row_nr: pl.UInt32})])
+        return rows.sort(self.row_nr).get_column(self.item_key)
+
+    def _get_known_selected_rows(self, rows: pl.DataFrame | None = None) -> pl.DataFrame | None:
+        """
+        lazy mode: row_nr and item_key of the current selection and of the `rows` of the page,
+        None if the page does not show the raw item_key
+        """
+        if not self.is_lazy or self.item_key == self.row_nr or self.is_select_all:
+            return None
+        # the keys of an empty selection can have no dtype
+        keys = self._selected_keys.cast(self.schema[self.item_key]).rename(self.item_key)
+        selected = pl.DataFrame([self.selection.cast(pl.UInt32).rename(self.row_nr), keys])
+        if rows is None:
+            return selected
+        rows = rows.select(self.row_nr, self.item_key)
+        if (
+            self.item_key in self.columns_repr_mapping
+            or rows.schema[self.item_key] != self.schema[self.item_key]
+        ):
+            return selected
+        return pl.concat([selected, rows.cast({self.row_nr: pl.UInt32})])
+
+    def _set_excluded(self, row_nrs: pl.Series) -> None:
+        """select-all mode: replace the rows of df_search that are not selected"""
+        self.excluded = row_nrs.cast(pl.UInt32).unique().sort().rename(self.row_nr)
+        self._on_selection_change()
+
+    def _on_selection_change(self) -> None:
+        """the counter, the badge and the v_model of the current page follow the selection"""
+        self._selection_version += 1
+        if self.is_select_all:
+            self.nb_selected = self._select_all_search[1] - len(self.excluded)
+        else:
+            self.nb_selected = len(self.selection)
+        self._sync_v_model()
+
+        # update the badge
+        if not self.single_select:
+            self.badge.v_slots = [{"name": "badge", "children": [str(self.nb_selected)]}]
+            self.badge.dot = not bool(self.nb_selected)
+        self.unselect.disabled = self.nb_selected == 0
+
+    def _sync_v_model(self) -> None:
+        # the frontend only needs the selected rows among the rendered ones
+        df_paginated = getattr(self, "df_paginated", None)
+        if df_paginated is not None:
+            if self.is_select_all:
+                is_selected = ~pl.col(self.row_nr).is_in(self.excluded)
+            else:
+                is_selected = pl.col(self.row_nr).is_in(self.selection)
+            self.v_model = df_paginated.filter(is_selected).collect().to_dicts()
 
     def _update_schema(self, schema):
         self.schema = schema
@@ -291,30 +709,41 @@ class Table(DataTableEnhanced):
         self._update_filters()
         self._update_filters_row()
 
-    def _on_input_table(self, *args):
-        previous_selected_keys = self.selected_keys or []
-        selected_rows = [i[self.row_nr] for i in self.v_model]
-        self.selected_keys = (
-            self.df.filter(pl.col(self.row_nr).is_in(selected_rows))
-            .select(self.item_key)
-            .collect()
-            .to_series()
-            .to_list()
-        )
-        self.last_selected_key = next(
-            (k for k in self.selected_keys if k not in previous_selected_keys), None
-        )
+    def _on_input_table(self, widget, event, data: list[dict[str, Any]]) -> None:
+        # the frontend only knows the rows of the current page, the selection of the other pages is kept
+        previous_selection = self.selection
+        selected_on_page = pl.Series(self.row_nr, [row[self.row_nr] for row in data], dtype=pl.UInt32)
+        if self.is_select_all:
+            # the rows of the page that are not selected anymore are excluded
+            page_row_nrs = self.df_paginated.select(self.row_nr).collect().to_series()
+            excluded = pl.concat(
+                [
+                    self.excluded.filter(~self.excluded.is_in(page_row_nrs)),
+                    page_row_nrs.filter(~page_row_nrs.is_in(selected_on_page)),
+                ]
+            )
+            self._set_excluded(excluded)
+            if self.filter_on_selected:
+                self._apply_filters()
+            return
+
+        df_page = self.df_paginated.collect()
+        page_row_nrs = df_page.get_column(self.row_nr)
+        if self.single_select:
+            selection = selected_on_page
+        else:
+            selection = pl.concat(
+                [previous_selection.filter(~previous_selection.is_in(page_row_nrs)), selected_on_page]
+            )
+        # a click does not scan the source: the keys are the ones of the page and of the previous selection
+        self._set_selection(selection, self._get_known_selected_rows(df_page))
+
+        new_row_nrs = self.selection.filter(~self.selection.is_in(previous_selection))
+        new_keys = self.selected_keys.filter(self.selection.is_in(new_row_nrs.head(1)))
+        self.last_selected_key = new_keys[0] if len(new_keys) else None
         # if ipyevents is installed
         if Event is not None:
-            self._manage_shift_click()
-
-        self.nb_selected = len(self.v_model)
-
-        # update the badge
-        if not self.single_select:
-            self.badge.v_slots = [{"name": "badge", "children": [str(self.nb_selected)]}]
-            self.badge.dot = not bool(self.nb_selected)
-        self.unselect.disabled = self.nb_selected == 0
+            self._manage_shift_click(new_row_nrs, page_row_nrs)
 
         # reset filter_on_selected widget
         if self.filter_on_selected:
@@ -322,40 +751,66 @@ class Table(DataTableEnhanced):
 
     def _update_df(self, df: pl.LazyFrame):
         # row_nr will be generated on the fly and should not be present at init
-        df = df.select(pl.exclude(self.row_nr))
+        # the schema is resolved on a copy and row_nr is only dropped if present:
+        # polars can then add the row numbers inside a scan and push down the slices of the pages
+        schema = df.clone().collect_schema()
+        if self.row_nr in schema:
+            df = df.drop(self.row_nr)
+            schema = df.clone().collect_schema()
 
-        schema = df.collect_schema()
         if schema != self.schema:
             self._update_schema(schema)
 
-        # df will be modify over and over
-        # so it's a good thing to cache the result when df change
-        # Moreover we need to have the height of df
-        eager_df = df.with_row_count(self.row_nr).collect()
-
-        self.df_height = eager_df.height
-        self._df = eager_df.lazy()
-
-        # align v_model, selected_keys and nb_selected
-        if self.selected_keys:
-            # If no item_key was given it is safer to erase v_model
-            if self.item_key == self.row_nr:
-                self.v_model = []
-                self.selected_keys = []
-                self.nb_selected = 0
-            else:
-                # realign row_rn
-                df_selected = eager_df.filter(pl.col(self.item_key).is_in(self.selected_keys))
-                self.v_model = (
-                    df_selected.lazy().pipe(self.jsonify).pipe(self.apply_custom_repr).collect().to_dicts()
-                )
-                self.selected_keys = df_selected[self.item_key].to_list()
-                self.nb_selected = len(self.selected_keys)
+        if self.is_lazy:
+            # the source can be larger than memory, only the row numbers are added to the plan
+            self._source = df
+            self._set_df(df.with_row_count(self.row_nr))
+        else:
+            # df will be modify over and over
+            # so it's a good thing to cache the result when df change
+            # Moreover we need to have the height of df
+            self._set_df(df.with_row_count(self.row_nr).collect())
+        self._align_selection(is_renumbered=True)
 
         self._update_all_filters()
         self._update_df_search()
         self._update_items()
 
+    def _set_df(self, df: pl.DataFrame | pl.LazyFrame) -> None:
+        # row_nr is always the position of the row in df
+        if isinstance(df, pl.LazyFrame):
+            self._eager_df = None
+            self._df = df
+            # counting on the source can be answered by the metadata of the files,
+            # a column is counted as polars panics on a bare len() of a filtered source whose row index was dropped
+            count = pl.first().len() if self.schema else pl.len()
+            self.df_height = self._source.select(count).collect(engine="streaming").item()
+        else:
+            self._eager_df = df
+            self._df = df.lazy()
+            self.df_height = df.height
+        self.df_version += 1
+
+        # once built, the text index follows the versions of df
+        if self._text_index is not None and not self.is_lazy:
+            self._build_text_index()
+
+    def _on_toggle_select_all(self, widget, event, data: dict[str, Any]) -> None:
+        # the header checkbox selects all the rows of df_search, not only the ones of the page
+        if data["value"]:
+            self.select_all()
+        else:
+            self.clear_selection()
+
+    def _align_selection(self, is_renumbered: bool) -> None:
+        # align the row numbers of the selection on the new df
+        if self.nb_selected:
+            # If no item_key was given it is safer to erase the selection
+            if self.item_key == self.row_nr and is_renumbered:
+                self._set_selection(self.selection.clear())
+            else:
+                self._set_selection(self._lookup_row_nrs(self.selected_keys))
+
     def on_nb_selected(self, *change):
         self._update_action_status()
 
@@ -376,42 +831,82 @@ class Table(DataTableEnhanced):
             self._update_headers()
 
     def _on_click_unselect(self, *args):
-        self.v_model = []
-
-    def _manage_shift_click(self):
-        selected_indices = set(i[self.row_nr] for i in self.v_model)
-        new_selected_indices = selected_indices - self.selected_indices
+        self.clear_selection()
+
+    def _manage_shift_click(self, new_row_nrs: pl.Series, page_row_nrs: pl.Series) -> None:
+        if not len(new_row_nrs):
+            self._last_selected_position = None
+            return
+
+        # the clicked row is on the rendered page, its position in the sorted order is known
+        position = self._get_window()[0] + page_row_nrs.to_list().index(new_row_nrs[0])
+        last = self._last_selected_position
+        if self.event.get("shiftKey") and last is not None and last[:2] == (self._search_key, self._sort_key):
+            start, end = sorted([last[2], position])
+            rows_in_beetween = self._get_row_nrs_in_order(start, end - start + 1)
+            self._set_selection(
+                pl.concat([self.selection, rows_in_beetween]), self._get_known_selected_rows()
+            )
 
-        if new_selected_indices:
-            last_selected_index = new_selected_indices.pop()
+        self._last_selected_position = self._search_key, self._sort_key, position
 
-            if self.event.get("shiftKey") and self.last_selected_index != -1:
-                rows_in_beetween = (
-                    self.df_search_sorted.filter(
-                        pl.col(self.row_nr).is_in([self.last_selected_index, last_selected_index]).cum_sum()
-                        == 1
-                    )
-                    # exclude already selected lines
-                    .filter(~pl.col(self.row_nr).is_in(selected_indices))
-                    .select(self.row_nr)
-                )
-                new_v_model = (
-                    self.jsonify(self.df.join(rows_in_beetween, on=self.row_nr)).collect().to_dicts()
-                )
-                self.v_model = self.v_model + new_v_model
-        else:
-            last_selected_index = -1
+    def _get_row_nrs_in_order(self, index_start: int, length: int) -> pl.Series:
+        """row numbers of the rows of df_search_sorted between two positions"""
+        permutation = self._get_sort_permutation(index_start + length)
+        if permutation is not None:
+            return permutation.slice(index_start, length)
+        # the slice is pushed down like the one of a page
+        return self.df_search_sorted.slice(index_start, length).select(self.row_nr).collect().to_series()
 
-        self.selected_indices = selected_indices
-        self.last_selected_index = last_selected_index
+    def _get_df_paginated(self) -> pl.LazyFrame:
+        return self._paginate(
+            self.df_search, self._eager_df, self.sort_permutation, self._sort_key, *self._get_window()
+        )
 
-    def _get_df_paginated(self):
-        if self.items_per_page != -1:
-            index_start = int((self.page - 1) * self.items_per_page)
+    def _get_window(self) -> tuple[int, int | None]:
+        """index of the first row to render and number of rows (None for all rows)"""
+        if self.virtual_scroll:
+            row_height, _, header_height = self._get_rows_height()
+            # the window starts between buffer and 2 * buffer rows above the viewport (see _on_scroll),
+            # 3 * buffer rows keep at least buffer rows below it
+            length = -(-int(self.height - header_height) // row_height) + 3 * self.virtual_scroll_buffer
+            # the window can point after the end of df_search when the filters change
+            index_start = max(0, min(self.window_start, int(self.server_items_length) - length))
+            return index_start, length
+        if self.items_per_page == -1:
+            return 0, None
+        return int((self.page - 1) * self.items_per_page), int(self.items_per_page)
+
+    def _get_neighbour_windows(self) -> list[tuple[int, int]]:
+        """windows rendered in the background: the previous and the next pages or scroll positions"""
+        index_start, length = self._get_window()
+        if length is None:
+            return []
+        step = self.virtual_scroll_buffer if self.virtual_scroll else length
+        return [
+            (start, length)
+            for start in (index_start - step, index_start + step)
+            if 0 <= start < self.server_items_length
+        ]
 
-            df_paginated = self.df_search_sorted.slice(index_start, int(self.items_per_page))
+    def _paginate(
+        self,
+        df_search: pl.LazyFrame,
+        eager_df: pl.DataFrame | None,
+        permutation: pl.Series | None,
+        sort_key: tuple[tuple[str, ...], tuple[bool, ...]] | None,
+        index_start: int,
+        length: int | None,
+    ) -> pl.LazyFrame:
+        if permutation is None:
+            if sort_key is not None:
+                # lazy mode: the sort is part of the plan, polars turns sort + slice into a top-k
+                df_search = self._sort_lazy(df_search, *sort_key, index_start + length if length else None)
+            df_paginated = df_search.slice(index_start, length)
         else:
-            df_paginated = self.df_search_sorted
+            # paging is a gather on the precomputed permutation
+            row_nrs = permutation.slice(index_start, length)
+            df_paginated = eager_df.select(pl.all().gather(row_nrs)).lazy()
 
         df_paginated = self.jsonify(df_paginated).pipe(self.apply_custom_repr)
 
@@ -431,38 +926,411 @@ class Table(DataTableEnhanced):
             pl.col(pl.Boolean).replace_strict({True: "✅", False: "❌"}, return_dtype=pl.Utf8, default=None),
         )
 
-        fill_null_repr_exprs = []
-        for c, df_repr in self.columns_repr.items():
-            if c in self.schema:
-                if not isinstance(self.schema[c], pl.List):
-                    df = df.join(df_repr, on=c, how="left")
-                    fill_null_repr_exprs.append(
-                        pl.col(c + "__repr").fill_null(pl.col(c).cast(pl.Utf8)).alias(c)
-                    )
+        repr_exprs = [
+            self.get_repr_expr(c)
+            for c in self.columns_repr_mapping
+            if c in self.schema and not isinstance(self.schema[c], pl.List)
+        ]
 
-        df = df.with_columns(fill_null_repr_exprs).select(self.row_nr, *self.schema)
+        df = df.with_columns(repr_exprs).select(self.row_nr, *self.schema)
         return df
 
+    def get_repr_expr(self, col: str) -> pl.Expr:
+        """map the values of `col` to their representation, values without representation are cast to string"""
+        mapping = self.columns_repr_mapping[col]
+        return (
+            pl.col(col)
+            .replace_strict(mapping[col], mapping[col + "__repr"], default=None, return_dtype=pl.Utf8)
+            .fill_null(pl.col(col).cast(pl.Utf8))
+        )
+
+    @property
+    def df_search_sorted(self) -> pl.LazyFrame:
+        """dataframe resulting of the sort"""
+        if self._sort_key is None:
+            return self.df_search
+        if self.is_lazy:
+            return self._sort_lazy(self.df_search, *self._sort_key)
+        return self._eager_df.select(pl.all().gather(self._get_sort_permutation())).lazy()
+
     def _update_df_search(self) -> None:
-        self.df_search, self.server_items_length = self._get_df_search()
+        with self._lock:
+            # the work running in background on the previous state is discarded
+            self._generation += 1
+            self._is_search_pending = False
+        self.loading = False
+
+        self._align_search_selection()
+        self._set_df_search(*self._get_df_search(), self._get_search_key())
         self._update_df_search_sorted()
 
+    def _set_df_search(self, df_search: pl.LazyFrame, search_height: int, search_key: Any) -> None:
+        self.df_search, self.server_items_length, self._search_key = df_search, search_height, search_key
+
+        # update undo_filters obj
+        _, filters_state, search_query, _ = search_key
+        is_filtered = search_query is not None or bool(filters_state)
+        self.actions["undo_filters"]["obj"].disabled = not is_filtered
+        self.actions["undo_filters"]["obj"].color = "primary" if is_filtered else None
+
+    def _align_search_selection(self, filters_key: Any = None) -> None:
+        """select-all mode: the selection is turned into rows before df_search follows `filters_key`"""
+        if filters_key is None:
+            filters_key = self._get_filters_key()
+        if self._search_key is None or self._search_key[1:3] == filters_key:
+            return
+        if self.is_select_all:
+            # the selected rows are the ones of the previous df_search
+            self._set_selection(self._get_selected_row_nrs())
+
+    def _get_search_key(self) -> Any:
+        return (
+            self.df_version,
+            *self._get_filters_key(),
+            self._selection_version if self.filter_on_selected else None,
+        )
+
+    def _get_filters_key(self) -> tuple[list[tuple[str, Any]], str | None]:
+        return self._get_filters_state(), self.search_query
+
+    def _get_filters_state(self) -> list[tuple[str, Any]]:
+        return [(name, class_.state) for name, class_ in self.filters.items() if class_.expr is not None]
+
     def _update_df_search_sorted(self) -> None:
-        if self.sort_by and self.sort_desc and all(c in self.df for c in self.sort_by):
-            self.df_search_sorted = self.df_search.sort(
-                self.sort_by,
-                descending=self.sort_desc,
-                maintain_order=True,
-                nulls_last=True,
+        self._sort_key = self._get_sort_key()
+        self.sort_permutation = self._get_sort_permutation(self._get_nb_rows_to_sort())
+
+    def _get_sort_key(self) -> tuple[tuple[str, ...], tuple[bool, ...]] | None:
+        if self.sort_by and self.sort_desc and all(c in self.schema for c in self.sort_by):
+            return tuple(self.sort_by), tuple(self.sort_desc)
+        # df_search is already in the initial order
+        return None
+
+    def _get_nb_rows_to_sort(self) -> int | None:
+        """number of sorted rows needed by the current page, None if all rows are needed"""
+        index_start, length = self._get_window()
+        if length is None:
+            return None
+        nb_rows = index_start + length
+        return nb_rows if nb_rows <= self.top_k_max_rows else None
+
+    def _get_sort_permutation(self, nb_rows: int | None = None) -> pl.Series | None:
+        """
+        row numbers of df_search in the sorted order (at least the `nb_rows` first ones),
+        cached by df version, filters state, sort_by and sort_desc
+        """
+        if self._sort_key is None or self.is_lazy:
+            return None
+        sort_by, sort_desc = self._sort_key
+
+        cached = self._get_cached_sort_permutation(sort_by, sort_desc)
+        if cached is not None and (cached[1] or (nb_rows is not None and cached[0].len() >= nb_rows)):
+            return cached[0]
+
+        # flipping the sort direction of a single column reuses the cached permutation
+        flipped = (
+            self._get_cached_sort_permutation(sort_by, (not sort_desc[0],)) if len(sort_by) == 1 else None
+        )
+        if flipped is not None and flipped[1]:
+            permutation, is_complete = self._flip_sort_permutation(flipped[0], sort_by[0]), True
+        else:
+            if nb_rows is not None and cached is not None:
+                # the user goes deeper, grow the partial sort geometrically
+                nb_rows = 2 * max(nb_rows, cached[0].len())
+            permutation, is_complete = self._sort_df_search(self.df_search, sort_by, sort_desc, nb_rows)
+
+        self._sort_cache.put((self._search_key, sort_by, sort_desc), (permutation, is_complete))
+
+        return permutation
+
+    def _get_cached_sort_permutation(
+        self, sort_by: tuple[str, ...], sort_desc: tuple[bool, ...]
+    ) -> tuple[pl.Series, bool] | None:
+        return self._sort_cache.get((self._search_key, sort_by, sort_desc))
+
+    def _sort_df_search(
+        self,
+        df_search: pl.LazyFrame,
+        sort_by: tuple[str, ...],
+        sort_desc: tuple[bool, ...],
+        nb_rows: int | None,
+    ) -> tuple[pl.Series, bool]:
+        """
+        return the sorted row numbers of df_search and whether all rows are sorted.
+        If `nb_rows` is given, a top-k on the first sort column bounds the rows to sort:
+        only the rows that can be in the `nb_rows` first ones are sorted
+        """
+        df = df_search.select(self.row_nr, *sort_by)
+        is_complete = True
+
+        dtype = self.schema[sort_by[0]]
+        if (
+            nb_rows is not None
+            and nb_rows <= self.top_k_max_rows
+            and (dtype.is_numeric() or dtype.is_temporal() or dtype == pl.String)
+        ):
+            # nulls are sorted last, they can pad top_k: the threshold is taken on the other values,
+            # if there are not enough of them every row is needed
+            values = df.select(sort_by[0]).collect().to_series().drop_nulls()
+            if values.len() > nb_rows:
+                top_k = values.top_k(nb_rows) if sort_desc[0] else values.bottom_k(nb_rows)
+                threshold = top_k.sort(descending=sort_desc[0])[-1]
+                # rows equal to the threshold are kept, so the result is a prefix of the full sort
+                df = df.filter(
+                    pl.col(sort_by[0]) >= threshold if sort_desc[0] else pl.col(sort_by[0]) <= threshold
+                )
+                is_complete = False
+
+        # row_nr breaks the ties: maintain_order is not honoured by a descending sort of an all-null column
+        permutation = (
+            df.sort([*sort_by, self.row_nr], descending=[*sort_desc, False], nulls_last=True)
+            .collect()
+            .get_column(self.row_nr)
+        )
+
+        return permutation, is_complete
+
+    def _sort_lazy(
+        self,
+        df_search: pl.LazyFrame,
+        sort_by: tuple[str, ...],
+        sort_desc: tuple[bool, ...],
+        nb_rows: int | None = None,
+    ) -> pl.LazyFrame:
+        """
+        sort df_search without collecting it, row_nr breaks the ties so that the order is stable.
+        If `nb_rows` is given, only the `nb_rows` first rows are kept
+        """
+        by = [*sort_by, self.row_nr]
+        descending = [*sort_desc, False]
+        if nb_rows is not None and nb_rows <= self.top_k_max_rows:
+            df_search = df_search.bottom_k(nb_rows, by=by, reverse=descending)
+        return df_search.sort(by, descending=descending, nulls_last=True)
+
+    def _flip_sort_permutation(self, permutation: pl.Series, col: str) -> pl.Series:
+        """
+        reverse a stable sort on `col` in O(n): runs of equal values are reversed
+        but each run keeps its order, nulls stay at the end
+        """
+        nb_nulls = self._eager_df.get_column(col).gather(permutation).null_count()
+        not_null = permutation.head(permutation.len() - nb_nulls)
+        nb_not_null = not_null.len()
+
+        # for each run [start, end] of equal values, position i moves to nb_not_null - start - end - 1 + i
+        new_positions = (
+            self._eager_df.select(
+                pl.col(col).gather(not_null).rle_id().alias("run_id"),
+                pl.int_range(nb_not_null, dtype=pl.Int64).alias("i"),
             )
+            .select(
+                nb_not_null
+                - pl.when(pl.col("run_id").ne_missing(pl.col("run_id").shift())).then("i").forward_fill()
+                - pl.when(pl.col("run_id").ne_missing(pl.col("run_id").shift(-1))).then("i").backward_fill()
+                - 1
+                + pl.col("i")
+            )
+            .to_series()
+        )
+        flipped = pl.zeros(nb_not_null, dtype=permutation.dtype, eager=True)
+        flipped.scatter(new_positions, not_null)
+
+        return pl.concat([flipped, permutation.tail(nb_nulls)])
+
+    def _update_items(self, page: tuple[pl.DataFrame, Any] | None = None) -> None:
+        """render the current window, `page` can be given if it is already computed"""
+        self.sort_permutation = self._get_sort_permutation(self._get_nb_rows_to_sort())
+
+        if page is None:
+            window = self._get_window()
+            key = self._get_page_key(window, self._search_key, self._sort_key)
+            page = self._page_cache.get(key)
+            if page is None:
+                df_paginated = self._get_df_paginated().collect()
+                page = df_paginated, self._render_items(df_paginated)
+                # the "All" page is not cached
+                if window[1] is not None:
+                    self._page_cache.put(key, page)
+
+        self.df_paginated = page[0].lazy()
+        self._sync_v_model()
+        if self.columnar_items is not None:
+            self.columnar_items.payload = page[1]
+            self._update_height(page[0].height)
         else:
-            # sort to the initial order
-            self.df_search_sorted = self.df_search.sort(self.row_nr)
+            self.items = page[1]
+
+        if self.virtual_scroll:
+            self._update_spacers(page[0].height)
+        self._prefetch_pages()
 
-    def _update_items(self) -> None:
-        self.df_paginated = self._get_df_paginated().collect().lazy()
+    def _render_items(self, df_paginated: pl.DataFrame) -> list[dict[str, Any]] | bytes:
+        if self.columnar_items is not None:
+            # one json object of columns, serialized by polars without python objects
+            payload = io.BytesIO()
+            df_paginated.select(pl.all().implode()).write_ndjson(payload)
+            return payload.getvalue()
+        return df_paginated.to_dicts()
 
-        self.items = self.df_paginated.collect().to_dicts()
+    def _get_page_key(
+        self,
+        window: tuple[int, int | None],
+        search_key: Any,
+        sort_key: tuple[tuple[str, ...], tuple[bool, ...]] | None,
+    ) -> Any:
+        return search_key, sort_key, self._columns_repr_version, *window
+
+    def _on_scroll(self, change: dict[str, Any]) -> None:
+        row_height, filter_height, _ = self._get_rows_height()
+        first_visible_row = max(0, change["new"] - filter_height * self.show_filters) // row_height
+        # the window moves by steps of virtual_scroll_buffer rows so that it can be cached
+        buffer = self.virtual_scroll_buffer
+        window_start = max(0, first_visible_row - buffer) // buffer * buffer
+        if window_start != self.window_start:
+            self.window_start = window_start
+            self._refresh()
+
+    def _update_spacers(self, nb_items: int) -> None:
+        # spacers take the place of the rows that are not rendered
+        row_height = self._get_rows_height()[0]
+        index_start = self._get_window()[0]
+        nb_rows_after = max(0, int(self.server_items_length) - index_start - nb_items)
+        self.top_spacer.children = [v.Html(tag="td", style_=f"height: {index_start * row_height}px")]  # type: ignore
+        self.bottom_spacer.children = [v.Html(tag="td", style_=f"height: {nb_rows_after * row_height}px")]  # type: ignore
+
+    def _prefetch_pages(self) -> None:
+        """sort and render the neighbour windows in the background"""
+        windows = [
+            (key, window)
+            for window in self._get_neighbour_windows()
+            if (key := self._get_page_key(window, self._search_key, self._sort_key)) not in self._page_cache
+        ]
+        if windows:
+            # work on a snapshot, the table state can change while prefetching
+            utils.executor.submit(
+                self._render_windows,
+                windows,
+                self._search_key,
+                self._sort_key,
+                self.df_search,
+                self._eager_df,
+            )
+
+    def _render_windows(
+        self,
+        windows: list[tuple[Any, tuple[int, int | None]]],
+        search_key: Any,
+        sort_key: tuple[tuple[str, ...], tuple[bool, ...]] | None,
+        df_search: pl.LazyFrame,
+        eager_df: pl.DataFrame | None,
+    ) -> list[tuple[pl.DataFrame, Any]]:
+        """sort df_search as needed and render the windows of a snapshot of the table, pages are cached"""
+        permutation = None
+        if sort_key is not None and eager_df is not None:
+            # make sure the rows after the windows are sorted too
+            nb_rows = (
+                None
+                if any(length is None for _, (_, length) in windows)
+                else max(index_start + 2 * length for _, (index_start, length) in windows)
+            )
+            cached = self._sort_cache.get((search_key, *sort_key))
+            if cached is not None and (cached[1] or (nb_rows is not None and cached[0].len() >= nb_rows)):
+                permutation = cached[0]
+            else:
+                permutation, is_complete = self._sort_df_search(
+                    df_search, *sort_key, None if nb_rows is None else 2 * nb_rows
+                )
+                self._sort_cache.put((search_key, *sort_key), (permutation, is_complete))
+
+        pages = []
+        for key, window in windows:
+            df = self._paginate(df_search, eager_df, permutation, sort_key, *window).collect()
+            pages.append((df, self._render_items(df)))
+            # the "All" page is not cached
+            if window[1] is not None:
+                self._page_cache.put(key, pages[-1])
+        return pages
+
+    def _on_change_options(self, is_sort_changed: bool) -> None:
+        self._refresh()
+
+    def _refresh(self, search: bool = False) -> None:
+        """
+        recompute df_search (if `search`), the sort and the current window.
+        In background mode, the work is done on the executor and the table shows a loading state
+        """
+        if not self.background:
+            if search:
+                self._update_df_search()
+            elif self._get_sort_key() != self._sort_key:
+                self._update_df_search_sorted()
+            self._update_items()
+            return
+
+        with self._lock:
+            self._generation += 1
+            # a page change does not supersede a filter change that is not applied yet
+            self._is_search_pending |= search
+            self.loading = True
+            # work on a snapshot, the table state can change while computing
+            if self._is_search_pending:
+                search, search_key = self._get_search_snapshot(), self._get_search_key()
+            else:
+                search, search_key = (self.df_search, self.server_items_length), self._search_key
+            utils.executor.submit(
+                self._refresh_in_background,
+                self._generation,
+                search,
+                search_key,
+                self._get_sort_key(),
+                self._get_window(),
+                self._eager_df,
+            )
+
+    def _refresh_in_background(
+        self,
+        generation: int,
+        search: SearchSnapshot | tuple[pl.LazyFrame, int],
+        search_key: Any,
+        sort_key: tuple[tuple[str, ...], tuple[bool, ...]] | None,
+        window: tuple[int, int | None],
+        eager_df: pl.DataFrame | None,
+    ) -> None:
+        """
+        run on the executor, the result is dropped as soon as a newer refresh is requested.
+        `search` is the snapshot of a pending search, or the current df_search and its height
+        """
+        is_search = isinstance(search, SearchSnapshot)
+        try:
+            if is_search:
+                df_search, search_height = self._get_df_search(snapshot=search)
+            else:
+                df_search, search_height = search
+
+            if generation != self._generation:
+                return
+            key = self._get_page_key(window, search_key, sort_key)
+            page = self._page_cache.get(key)
+            if page is None:
+                page = self._render_windows([(key, window)], search_key, sort_key, df_search, eager_df)[0]
+
+            with self._lock:
+                if generation != self._generation:
+                    return
+                if is_search:
+                    # the selection is only modified by the latest refresh, df_search selects the same rows
+                    # before and after the alignment but its key follows the new selection version
+                    self._align_search_selection(search_key[1:3])
+                    self._set_df_search(
+                        df_search, search_height, (*search_key[:-1], self._get_search_key()[-1])
+                    )
+                    self._is_search_pending = False
+                self._sort_key = sort_key
+                # the window can be moved by the new height of df_search in virtual scroll mode
+                self._update_items(page if self._get_window() == window else None)
+        finally:
+            with self._lock:
+                if generation == self._generation:
+                    self.loading = False
 
     def _get_slots(self) -> list[dict[str, Any]]:
         tooltip_actions = [
@@ -490,6 +1358,7 @@ class Table(DataTableEnhanced):
                 *([v.Divider(vertical=True, class_="mx-5")] if tooltip_custom_actions else []),
                 *tooltip_custom_actions,
                 self.dialog,
+                *([self.columnar_items] if self.columnar_items else []),
             ],
         )
         if not self.toolbar_title.children and not tooltip_actions:
@@ -497,8 +1366,15 @@ class Table(DataTableEnhanced):
 
         slots = [
             {"name": "top", "variable": "top", "children": toolbar},
-            {"name": "body.prepend", "children": [self.filters_row]},
+            {
+                "name": "body.prepend",
+                "children": [self.filters_row, self.top_spacer]
+                if self.virtual_scroll
+                else [self.filters_row],
+            },
         ]
+        if self.virtual_scroll:
+            slots.append({"name": "body.append", "children": [self.bottom_spacer]})
         return slots
 
     def _update_filters(self) -> None:
@@ -534,63 +1410,278 @@ class Table(DataTableEnhanced):
 
             self.filters_row.children = filters_child
 
+    def _get_search_bitmap(self, snapshot: SearchSnapshot) -> pl.Series | None:
+        """
+        return the AND of the cached bitmaps of the filters of `snapshot`,
+        None if no filter is active
+        """
+        df = snapshot.df_version, snapshot.eager_df
+        bitmaps = [class_.get_bitmap((expr, state), df) for class_, expr, state in snapshot.filters]
+
+        if snapshot.selected is not None:
+            row_nrs = snapshot.selected.collect().to_series()
+            bitmaps.append(snapshot.eager_df.get_column(self.row_nr).is_in(row_nrs))
+
+        if snapshot.search_query:
+            bitmaps.append(self._get_text_search_bitmap(snapshot))
+
+        return reduce(operator.and_, bitmaps) if bitmaps else None
+
+    def get_column_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        null_count, approximate n_unique, and min and max (for the ordered dtypes) of each column of df,
+        computed in one query and cached until df changes
+        """
+        if self._column_stats is not None and self._column_stats[0] == self.df_version:
+            return self._column_stats[1]
+
+        exprs = []
+        for name, dtype in self.schema.items():
+            if dtype == pl.Object:
+                continue
+            fields = [pl.col(name).null_count().alias("null_count")]
+            # a Null column (all None, as read from a file) only has a null count
+            if not dtype.is_nested() and dtype != pl.Null:
+                fields.append(pl.col(name).to_physical().approx_n_unique().alias("n_unique"))
+            if dtype.is_numeric() or dtype.is_temporal() or dtype in (pl.Boolean, pl.Utf8):
+                fields += [pl.col(name).min().alias("min"), pl.col(name).max().alias("max")]
+            exprs.append(pl.struct(fields).alias(name))
+
+        stats = self.df.select(exprs).collect().row(0, named=True) if exprs else {}
+        self._column_stats = self.df_version, stats
+        return stats
+
+    def get_facets(self) -> dict[str, pl.DataFrame]:
+        """
+        distinct values of the initialized combobox filters with their number of rows ("#") under all the other filters,
+        computed in one batch and cached until df or the filters change
+        """
+        key = self._get_search_key()
+        columns = [
+            name
+            for name, class_ in self.filters.items()
+            if isinstance(class_, FilterCombobox) and class_.is_initialized
+        ]
+        if self._facets is not None and self._facets[0] == key and set(columns) <= self._facets[1].keys():
+            return self._facets[1]
+
+        plans = []
+        for c in columns:
+            mask_expr = self._get_search_mask_expr(filters=[n for n in self.filters if n != c])
+            if isinstance(self.schema[c], pl.List):
+                # count the rows containing each element, empty lists are counted as null
+                df = self.df.select(pl.col(c).list.unique(), mask_expr).explode(c)
+            else:
+                df = self.df.select(pl.col(c), mask_expr)
+            plans.append(df.group_by(c).agg(pl.col("#").sum()))
+        self._facets = key, dict(zip(columns, pl.collect_all(plans)))
+        return self._facets[1]
+
+    def _get_search_mask_expr(self, filters: list[str] | None = None) -> pl.Expr:
+        """boolean column "#" of the rows of df kept by the search, using only the filters in `filters` if given"""
+        snapshot = self._get_search_snapshot(filters)
+        if self.is_lazy:
+            exprs = [self._get_lazy_predicate(snapshot)]
+            if snapshot.selected is not None:
+                exprs.append(pl.col(self.item_key).is_in(snapshot.selected.collect().to_series()))
+            exprs = [expr for expr in exprs if expr is not None]
+            expr = pl.coalesce(reduce(operator.and_, exprs), False) if exprs else pl.lit(True)
+        else:
+            bitmap = self._get_search_bitmap(snapshot)
+            expr = pl.lit(True) if bitmap is None else pl.lit(bitmap)
+        return expr.alias("#")
+
     def _get_df_search(
         self,
-        filters: None | list[str] = None,
+        filters: list[str] | None = None,
+        snapshot: SearchSnapshot | None = None,
     ) -> tuple[pl.LazyFrame, int]:
         """
         return a lazy filtered version of df and the its height,
-        you can either given a custom list of `masks` or
-        you can use the mask of each filter spcified in `filters`
+        you can use the mask of each filter spcified in `filters`, or the settings of a `snapshot`
         """
-        masks: list[pl.LazyFrame] = [
-            class_.mask.select(pl.col(self.row_nr))
+        if snapshot is None:
+            snapshot = self._get_search_snapshot(filters)
+
+        if self.is_lazy:
+            df_search = self._get_lazy_search(snapshot)
+            # the row numbers are counted as polars panics on a bare len() of a filtered row index
+            search_height = (
+                snapshot.df_height
+                if df_search is snapshot.df
+                else df_search.select(pl.col(self.row_nr).len()).collect(engine="streaming").item()
+            )
+            return df_search, search_height
+
+        bitmap = self._get_search_bitmap(snapshot)
+        if bitmap is not None:
+            df_search = snapshot.eager_df.filter(bitmap).lazy()
+            search_height = bitmap.sum()
+        else:
+            df_search = snapshot.df
+            search_height = snapshot.df_height
+
+        return df_search, search_height
+
+    def _get_search_snapshot(self, filters: list[str] | None = None) -> SearchSnapshot:
+        """the current settings of the search, using only the filters in `filters` if given"""
+        selected = None
+        if self.filter_on_selected:
+            column = self.item_key if self.is_lazy else self.row_nr
+            if self.is_select_all:
+                selected = self.df_selected.select(column)
+            else:
+                selected = (self._selected_keys if self.is_lazy else self.selection).to_frame(column).lazy()
+
+        return SearchSnapshot(
+            df_version=self.df_version,
+            df=self.df,
+            df_height=self.df_height,
+            eager_df=self._eager_df,
+            filters=[
+                (class_, class_.expr, class_.state)
+                for name, class_ in self.filters.items()
+                if (filters is None or name in filters) and class_.expr is not None
+            ],
+            search_query=self.search_query,
+            selected=selected,
+        )
+
+    @property
+    def filter_expr(self) -> pl.Expr | None:
+        """AND of the expressions of the active filters, None if no filter is active"""
+        return self._get_filter_expr()
+
+    def _get_filter_expr(self, filters: list[str] | None = None) -> pl.Expr | None:
+        exprs = [
+            class_.expr
             for name, class_ in self.filters.items()
-            if (filters is None or name in filters) and class_.mask is not None
+            if (filters is None or name in filters) and class_.expr is not None
         ]
+        return reduce(operator.and_, exprs) if exprs else None
 
-        # update undo_filters obj
-        self.actions["undo_filters"]["obj"].disabled = not masks
-        self.actions["undo_filters"]["obj"].color = "primary" if masks else None
+    def _get_lazy_search(self, snapshot: SearchSnapshot) -> pl.LazyFrame:
+        """
+        lazy mode: the source filtered by the filters of `snapshot`,
+        the predicate is pushed down to the scans of the source so that they can skip row groups
+        """
+        expr = self._get_lazy_predicate(snapshot)
+        df = snapshot.df if expr is None else snapshot.df.filter(expr)
 
-        if self.filter_on_selected:
-            masks.append(self.df_selected.select(self.row_nr))
+        if snapshot.selected is not None:
+            df = df.filter(pl.col(self.item_key).is_in(snapshot.selected.collect().to_series()))
 
-        # apply all masks
-        if masks:
-            mask = reduce(lambda lhs, rhs: lhs.join(rhs, on=self.row_nr, how="semi"), masks).collect()
-            search_height = mask.height
-            df_search = self.df.join(mask.lazy(), on=self.row_nr, how="semi")
+        return df
 
-        else:
-            df_search = self.df
-            search_height = self.df_height
+    def _get_lazy_predicate(self, snapshot: SearchSnapshot) -> pl.Expr | None:
+        """lazy mode: the filters and the table-wide search as a single predicate"""
+        exprs = [expr for _, expr, _ in snapshot.filters]
+        if snapshot.search_query:
+            exprs.append(self._get_text_search_expr(snapshot.search_query))
+        return reduce(operator.and_, exprs) if exprs else None
+
+    def _on_search(self, widget, event, data):
+        # wait for the user to stop typing
+        if self._search_timer is not None:
+            self._search_timer.cancel()
+        self._search_timer = threading.Timer(
+            self.search_debounce, self._search_on_timer, args=(data, self._generation)
+        )
+        self._search_timer.start()
+
+    def _search_on_timer(self, query: str | None, generation: int) -> None:
+        """run by the debounce timer, under the lock, once the table is not refreshed anymore"""
+        with self._lock:
+            # a newer keystroke or an undo of the filters supersedes the query
+            if threading.current_thread() is not self._search_timer:
+                return
+            if generation != self._generation:
+                # the table was refreshed since the keystroke, wait for it to settle
+                self._on_search(None, None, query)
+                return
+            self._search_timer = None
+            self._search(query)
+
+    def _search(self, query: str | None) -> None:
+        self.search_query = query.lower() if query else None
+        if self.search_query and not self.is_lazy:
+            self._build_text_index()
+        self._apply_filters()
 
-        return df_search, search_height
+    def _get_text_columns(self) -> dict[str, pl.DataType]:
+        """columns searched by the table-wide search: the ones that can be cast to string"""
+        return {
+            c: dtype
+            for c, dtype in self.schema.items()
+            if not isinstance(dtype, (pl.List, pl.Array, pl.Struct, pl.Object, pl.Binary))
+        }
+
+    def _get_text_search_expr(self, query: str) -> pl.Expr:
+        return pl.any_horizontal(
+            utils.TrigramIndex.get_text_expr(c, dtype).str.contains(query, literal=True)
+            for c, dtype in self._get_text_columns().items()
+        )
+
+    def _get_text_search_bitmap(self, snapshot: SearchSnapshot) -> pl.Series:
+        text_index = self._text_index
+        if text_index is not None and text_index[0] == snapshot.df_version:
+            return text_index[1].search(snapshot.search_query)
+        # the index of this version of df is not ready yet
+        expr = pl.coalesce(self._get_text_search_expr(snapshot.search_query), False)
+        return snapshot.eager_df.select(expr).to_series()
+
+    def _build_text_index(self) -> None:
+        """index the text of df in background, the previous index is updated if the columns did not change"""
+        if self._text_index_version == self.df_version:
+            return
+        self._text_index_version = self.df_version
+
+        columns = self._get_text_columns()
+        text_index = self._text_index[1] if self._text_index is not None else None
+        if text_index is None or text_index.columns != columns:
+            text_index = utils.TrigramIndex(columns)
+        utils.executor.submit(self._update_text_index, text_index, self.df_version, self._eager_df)
+
+    def _update_text_index(
+        self, text_index: utils.TrigramIndex, df_version: int, eager_df: pl.DataFrame
+    ) -> None:
+        text_index = text_index.update(eager_df)
+        if df_version == self.df_version:
+            self._text_index = df_version, text_index
 
     def _apply_filters(self) -> None:
-        self._update_df_search()
-        self._update_items()
+        self._refresh(search=True)
 
         # dirty fix where table is filtered and is not in the first page
         if self.page != 1:
             self.page = 2
             self.page = 1
 
-    def _update_all_filters(self) -> None:
-        for class_ in self.filters.values():
+    def _update_all_filters(self, columns: set[str] | None = None) -> None:
+        """
+        refresh the options of the initialized filters (only the ones in `columns` if given)
+        and rebuild the active masks against the new df
+        """
+        for name, class_ in self.filters.items():
             if class_.is_initialized:
-                class_._update_filter()
-                if class_.mask is not None:
+                if columns is None or name in columns:
+                    class_._update_filter()
+                if class_.expr is not None:
                     class_._update_mask()
 
     def _undo_all_filters(self, *args: Any) -> None:
         for f in self.filters.values():
             if f.is_initialized:
                 f._undo()
-
-        self._update_df_search()
-        self._update_items()
+        with self._lock:
+            # a pending table-wide search is dropped with the others
+            if self._search_timer is not None:
+                self._search_timer.cancel()
+                self._search_timer = None
+            self.search_query = None
+        self.actions["search"]["obj"].v_model = None
+
+        self._refresh(search=True)
 
     def _toggle_multi_sort(self, widget, event, data):
         self.multi_sort: bool = not self.multi_sort
@@ -1,6 +1,20 @@
+import operator
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Any
+
 import ipyvuetify as v
+import ipywidgets as ipw
 import polars as pl
 import traitlets
+from ipywidgets.widgets.widget import widget_serialization
+
+# shared by all tables to run background work (prefetching, ...)
+executor = ThreadPoolExecutor(thread_name_prefix="ipyvuetable")
 
 
 def string_to_duration(df: pl.LazyFrame) -> pl.LazyFrame:
@@ -15,6 +29,465 @@ def string_to_duration(df: pl.LazyFrame) -> pl.LazyFrame:
     )
 
 
+def to_eager(df: pl.DataFrame | pl.LazyFrame | None) -> pl.DataFrame | None:
+    return df.collect() if isinstance(df, pl.LazyFrame) else df
+
+
+def conform_rows(rows: pl.DataFrame, schema: dict[str, pl.DataType]) -> pl.DataFrame:
+    """new rows with the columns of `schema` cast to its dtypes, the missing ones are null"""
+    return rows.select(
+        pl.col(c).cast(dtype) if c in rows.columns else pl.lit(None, dtype=dtype).alias(c)
+        for c, dtype in schema.items()
+    )
+
+
+def conform_update(rows: pl.DataFrame, key: str, schema: dict[str, pl.DataType]) -> pl.DataFrame:
+    """updated rows: `key` and the other columns of `schema`, cast to its dtypes"""
+    columns = [key, *[c for c in rows.columns if c in schema and c != key]]
+    return rows.select(pl.col(c).cast(schema[c]) if c in schema else pl.col(c) for c in columns)
+
+
+class LRUCache:
+    """
+    Bounded least recently used cache, thread safe.
+    Keys only need to support equality so that they can hold lists (filters states, ...)
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: list[tuple[Any, Any]] = []
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return any(k == key for k, _ in self._entries)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            for i, (k, value) in enumerate(self._entries):
+                if k == key:
+                    self._entries.append(self._entries.pop(i))
+                    return value
+        return default
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._entries = [(k, v) for k, v in self._entries if k != key]
+            self._entries.append((key, value))
+            del self._entries[: -self.maxsize]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TrigramIndex:
+    """
+    Substring index over the lowercased text of `columns`.
+    The distinct texts are numbered and each cell is stored as the number of its text,
+    the trigrams of the texts are encoded as integers and sorted so that their texts are found by binary search.
+    A query only checks the texts that contain all its trigrams, then maps them back to the rows.
+    """
+
+    char_base = 1 << 21  # a trigram is the number of its 3 characters written in this base
+
+    def __init__(self, columns: dict[str, pl.DataType]):
+        self.columns = columns
+        self.alphabet = pl.Series("char", [], dtype=pl.String)  # the number of a character is its position
+        self.texts = pl.Series("text", [], dtype=pl.String)  # the number of a text is its position
+        self.trigrams = pl.DataFrame(schema={"trigram": pl.UInt64, "text_id": pl.UInt32})
+        self.codes = pl.DataFrame(schema={c: pl.UInt32 for c in columns})
+
+    @staticmethod
+    def get_text_expr(col: str, dtype: pl.DataType) -> pl.Expr:
+        """lowercased text of a column, as searched by the index"""
+        expr = (
+            pl.col(col).dt.to_string("polars")
+            if isinstance(dtype, pl.Duration)
+            else pl.col(col).cast(pl.Utf8)
+        )
+        return expr.str.to_lowercase()
+
+    def update(self, df: pl.DataFrame) -> "TrigramIndex":
+        """return the index of `df`, only the texts that are not already indexed are split into trigrams"""
+        df_texts = df.select(self.get_text_expr(c, dtype) for c, dtype in self.columns.items())
+        new_texts = pl.concat([df_texts.get_column(c).drop_nulls().unique() for c in self.columns]).unique()
+        new_texts = new_texts.filter(~new_texts.is_in(self.texts)).rename("text")
+
+        index = TrigramIndex(self.columns)
+        index.alphabet = self.alphabet
+        index.texts = pl.concat([self.texts, new_texts])
+        index.trigrams = pl.concat([self.trigrams, index._split(new_texts, offset=self.texts.len())]).sort(
+            "trigram"
+        )
+        text_ids = pl.int_range(index.texts.len(), dtype=pl.UInt32, eager=True)
+        index.codes = df_texts.select(
+            pl.col(c).replace_strict(index.texts, text_ids, default=None, return_dtype=pl.UInt32)
+            for c in self.columns
+        )
+        return index
+
+    def _split(self, texts: pl.Series, offset: int) -> pl.DataFrame:
+        """trigrams of `texts` (numbered from `offset`), new characters are added to the alphabet"""
+        chars = (
+            texts.to_frame()
+            .with_columns(
+                (pl.int_range(pl.len(), dtype=pl.UInt32) + offset).alias("text_id"),
+                pl.col("text").str.split(""),
+            )
+            .explode("text")
+            .drop_nulls("text")
+        )
+        if chars.is_empty():
+            # empty texts have no character (and no trigram)
+            return pl.DataFrame(schema={"trigram": pl.UInt64, "text_id": pl.UInt32})
+        new_chars = chars.get_column("text").unique()
+        self.alphabet = pl.concat(
+            [self.alphabet, new_chars.filter(~new_chars.is_in(self.alphabet)).rename("char")]
+        )
+
+        char = pl.col("text").replace_strict(
+            self.alphabet,
+            pl.int_range(self.alphabet.len(), dtype=pl.UInt64, eager=True),
+            return_dtype=pl.UInt64,
+        )
+        return (
+            chars.select(
+                ((char * self.char_base + char.shift(-1)) * self.char_base + char.shift(-2)).alias("trigram"),
+                "text_id",
+                # the 3 characters belong to the same text
+                (pl.col("text_id").shift(-2) == pl.col("text_id")).alias("is_trigram"),
+            )
+            .filter("is_trigram")
+            .drop("is_trigram")
+            # a text is listed once per trigram, even if the trigram is repeated in the text
+            .unique(maintain_order=True)
+        )
+
+    def _encode(self, query: str) -> list[int] | None:
+        """trigrams of the query, None if one of its characters is not in the alphabet"""
+        char_ids = dict(zip(self.alphabet.to_list(), range(self.alphabet.len())))
+        if any(c not in char_ids for c in query):
+            return None
+        ids = [char_ids[c] for c in query]
+        return list({(a * self.char_base + b) * self.char_base + c for a, b, c in zip(ids, ids[1:], ids[2:])})
+
+    def search(self, query: str) -> pl.Series:
+        """boolean mask of the rows with a cell containing `query`"""
+        query = query.lower()
+
+        if len(query) < 3:
+            # short queries have no trigram, all texts are checked
+            matches = self.texts.str.contains(query, literal=True).arg_true()
+        elif (trigrams := self._encode(query)) is None:
+            matches = pl.Series([], dtype=pl.UInt32)
+        else:
+            # texts containing all the trigrams of the query
+            bounds = self.trigrams.select(
+                pl.col("trigram").search_sorted(pl.Series(trigrams, dtype=pl.UInt64), "left").alias("start"),
+                pl.col("trigram").search_sorted(pl.Series(trigrams, dtype=pl.UInt64), "right").alias("end"),
+            )
+            text_ids = None
+            for start, end in bounds.iter_rows():
+                ids = self.trigrams.get_column("text_id").slice(start, end - start)
+                text_ids = ids if text_ids is None else text_ids.filter(text_ids.is_in(ids))
+            # the trigrams can be in a different order than in the query
+            matches = text_ids.filter(self.texts.gather(text_ids).str.contains(query, literal=True))
+
+        if matches.is_empty():
+            return pl.repeat(False, self.codes.height, eager=True)
+        is_match = pl.repeat(False, self.texts.len(), eager=True)
+        is_match.scatter(matches.unique().sort(), True)
+        return reduce(
+            operator.or_,
+            [is_match.gather(self.codes.get_column(c)).fill_null(False) for c in self.columns],
+            pl.repeat(False, self.codes.height, eager=True),
+        )
+
+
+class ChangeSet:
+    """
+    Net effect of a sequence of create, update and delete operations on the rows of a table keyed by `key`,
+    whatever the number of operations it is applied by a single Table.apply_delta
+    """
+
+    def __init__(self, key: str, schema: dict[str, pl.DataType]):
+        self.key = key
+        self.schema = schema
+        # consecutive operations of the same kind (and columns) are batched, they are resolved on apply
+        self.operations: list[tuple[str, list[pl.DataFrame]]] = []
+
+    def is_empty(self) -> bool:
+        return not self.operations
+
+    def create(self, rows: pl.DataFrame) -> None:
+        self._log("create", self._conform(rows))
+
+    def update(self, rows: pl.DataFrame) -> None:
+        """`rows` patch the given columns of the rows with the same key"""
+        self._log("update", conform_update(rows, self.key, self.schema))
+
+    def delete(self, keys: pl.Series) -> None:
+        self._log("delete", keys.cast(self.schema[self.key]).rename(self.key).to_frame())
+
+    def _log(self, kind: str, rows: pl.DataFrame) -> None:
+        if (
+            self.operations
+            and self.operations[-1][0] == kind
+            and self.operations[-1][1][0].columns == rows.columns
+        ):
+            self.operations[-1][1].append(rows)
+        else:
+            self.operations.append((kind, [rows]))
+
+    def resolve(
+        self, get_rows: Callable[[pl.Series], pl.DataFrame]
+    ) -> tuple[pl.DataFrame, pl.DataFrame, pl.Series]:
+        """
+        inserted rows, updated rows (key and modified columns) and deleted keys,
+        `get_rows` returns the rows of the table with the given keys (fetched once for all the updates)
+        """
+        update_keys = [
+            rows.get_column(self.key) for kind, batch in self.operations if kind == "update" for rows in batch
+        ]
+        current_rows = self._conform(get_rows(pl.concat(update_keys).unique())) if update_keys else None
+
+        inserted = pl.DataFrame(schema=self.schema)
+        updated = pl.DataFrame(schema=self.schema)
+        updated_columns: set[str] = set()
+        deleted_keys = pl.Series(self.key, [], dtype=self.schema[self.key])
+        for kind, batch in self.operations:
+            rows = pl.concat(batch)
+            keys = rows.get_column(self.key)
+            if kind == "create":
+                inserted = pl.concat([inserted, rows])
+            elif kind == "delete":
+                inserted = inserted.filter(~pl.col(self.key).is_in(keys))
+                updated = updated.filter(~pl.col(self.key).is_in(keys))
+                deleted_keys = pl.concat([deleted_keys, keys]).unique(maintain_order=True)
+            else:
+                rows = rows.unique(self.key, keep="last", maintain_order=True)
+                # rows created in the change-set are patched directly
+                inserted = inserted.update(rows, on=self.key, include_nulls=True)
+                # the other ones are kept as full rows so that updates of different columns can be combined
+                is_new = ~keys.is_in(updated.get_column(self.key)) & ~keys.is_in(
+                    inserted.get_column(self.key)
+                )
+                new_rows = current_rows.filter(pl.col(self.key).is_in(keys.filter(is_new)))
+                updated = pl.concat([updated, new_rows]).update(rows, on=self.key, include_nulls=True)
+                updated_columns.update(rows.columns[1:])
+        updated = updated.select(self.key, *[c for c in self.schema if c in updated_columns])
+        return inserted, updated, deleted_keys
+
+    def apply(self, table) -> None:
+        inserted, updated, deleted_keys = self.resolve(table._get_rows_by_key)
+        table.apply_delta(
+            inserted=inserted if inserted.height else None,
+            updated=updated if updated.height else None,
+            deleted_keys=deleted_keys if len(deleted_keys) else None,
+            on=self.key,
+        )
+
+    def _conform(self, rows: pl.DataFrame) -> pl.DataFrame:
+        return conform_rows(rows, self.schema)
+
+
+class ChangeSetSink:
+    """
+    Accumulates the edits of a table and passes their net effect in batches to `write(inserted, updated, deleted_keys)`:
+    once `max_rows` rows are pending, `max_delay` seconds after the first pending edit, or on flush.
+    `updated` only holds the key and the modified columns, a batch is meant to be applied as deletes, updates, inserts.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[pl.DataFrame, pl.DataFrame, pl.Series], None],
+        max_rows: int = 10_000,
+        max_delay: float | None = 5.0,
+    ):
+        self.write = write
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.change_set: ChangeSet | None = None
+        self.nb_rows = 0  # rows of the pending operations
+        self._get_rows: Callable[[pl.Series], pl.DataFrame] | None = None
+        # rows of the table before their first pending update: they are fetched on the thread of the edits,
+        # a flush by the timer does not read the table while it is modified
+        self._current_rows: list[pl.DataFrame] = []
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+
+    def attach(
+        self, key: str, schema: dict[str, pl.DataType], get_rows: Callable[[pl.Series], pl.DataFrame]
+    ) -> None:
+        """set by the table: its key, its schema and how to get its rows by key"""
+        self.flush()
+        with self._lock:
+            self.change_set = ChangeSet(key, schema)
+            self._get_rows = get_rows
+
+    def create(self, rows: pl.DataFrame) -> None:
+        with self._lock:
+            self.change_set.create(rows)
+            self._on_change(rows.height)
+
+    def update(self, rows: pl.DataFrame) -> None:
+        with self._lock:
+            self._current_rows.append(
+                self.change_set._conform(self._get_rows(rows.get_column(self.change_set.key)))
+            )
+            self.change_set.update(rows)
+            self._on_change(rows.height)
+
+    def delete(self, keys: pl.Series) -> None:
+        with self._lock:
+            self.change_set.delete(keys)
+            self._on_change(len(keys))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.change_set is None or self.change_set.is_empty():
+                return
+            change_set = self.change_set
+            self.change_set = ChangeSet(change_set.key, change_set.schema)
+            self.nb_rows = 0
+            # only the first version of each row is kept, the updates are applied on it
+            current_rows = pl.concat(self._current_rows) if self._current_rows else None
+            self._current_rows = []
+            self.write(
+                *change_set.resolve(
+                    lambda keys: current_rows.unique(change_set.key, keep="first", maintain_order=True)
+                )
+            )
+
+    def _on_change(self, nb_rows: int) -> None:
+        self.nb_rows += nb_rows
+        if self.nb_rows >= self.max_rows:
+            self.flush()
+        elif self._timer is None and self.max_delay is not None:
+            self._timer = threading.Timer(self.max_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+class ParquetChangeWriter:
+    """ChangeSetSink writer: each batch is written in `directory` as <batch>-deleted/updated/inserted.parquet files"""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # the numbering goes on after the batches of a previous session
+        self.batch = len({path.name.split("-")[0] for path in self.directory.glob("*.parquet")})
+
+    def __call__(self, inserted: pl.DataFrame, updated: pl.DataFrame, deleted_keys: pl.Series) -> None:
+        frames = {"deleted": deleted_keys.to_frame(), "updated": updated, "inserted": inserted}
+        for name, frame in frames.items():
+            if frame.height:
+                frame.write_parquet(self.directory / f"{self.batch:06d}-{name}.parquet")
+        self.batch += 1
+
+
+class SQLiteChangeWriter:
+    """
+    ChangeSetSink writer: each batch is applied to the table `table` of the SQLite database `path`, in one transaction.
+    The table is created if needed, the values must be supported by sqlite3 (nested columns are not).
+    """
+
+    def __init__(self, path: str | Path, table: str):
+        self.path = path
+        self.table = table
+
+    def __call__(self, inserted: pl.DataFrame, updated: pl.DataFrame, deleted_keys: pl.Series) -> None:
+        table = f'"{self.table}"'
+        key = f'"{deleted_keys.name}"'
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                columns = ", ".join(f'"{c}"' for c in inserted.columns)
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+                connection.executemany(f"DELETE FROM {table} WHERE {key} = ?", [(k,) for k in deleted_keys])
+                if updated.width > 1:
+                    assignments = ", ".join(f'"{c}" = ?' for c in updated.columns[1:])
+                    connection.executemany(
+                        f"UPDATE {table} SET {assignments} WHERE {key} = ?",
+                        updated.select(*updated.columns[1:], updated.columns[0]).iter_rows(),
+                    )
+                placeholders = ", ".join("?" for _ in inserted.columns)
+                connection.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", inserted.iter_rows()
+                )
+        finally:
+            connection.close()
+
+
+class EditJournal:
+    """
+    Bounded undo/redo history of a table.
+    An entry is a row-level delta (the keyword arguments of Table.apply_delta) reverting one edit,
+    the oldest entries are evicted once their estimated size exceeds `max_bytes`.
+    Entries only apply to the version of df they were recorded for, the history is dropped when df changes otherwise.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.undo_stack: list[tuple[dict[str, Any], int]] = []  # (delta, estimated size)
+        self.redo_stack: list[tuple[dict[str, Any], int]] = []
+        self.nbytes = 0
+        self.version: int | None = None  # df_version the top entries apply to
+
+    def record(self, delta: dict[str, Any] | None, version_before: int, version_after: int) -> None:
+        """a new edit: `delta` reverts it (None if it can't be reverted), the redo history is dropped"""
+        if version_before != self.version or delta is None:
+            self.clear()
+        self._drop(self.redo_stack)
+        if delta is not None:
+            self._push(self.undo_stack, delta)
+        self.version = version_after
+
+    def pop(self, stack: list[tuple[dict[str, Any], int]], version: int) -> dict[str, Any] | None:
+        if version != self.version:
+            self.clear()
+        if not stack:
+            return None
+        delta, nbytes = stack.pop()
+        self.nbytes -= nbytes
+        return delta
+
+    def push(
+        self, stack: list[tuple[dict[str, Any], int]], delta: dict[str, Any] | None, version: int
+    ) -> None:
+        """after an undo (or a redo): `delta` reverts it on the opposite stack"""
+        if delta is None:
+            self.clear()
+        else:
+            self._push(stack, delta)
+        self.version = version
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.nbytes = 0
+
+    def _push(self, stack: list[tuple[dict[str, Any], int]], delta: dict[str, Any]) -> None:
+        nbytes = sum(
+            value.estimated_size() for value in delta.values() if isinstance(value, pl.DataFrame | pl.Series)
+        )
+        stack.append((delta, nbytes))
+        self.nbytes += nbytes
+        # the oldest edits are at the bottom of the undo stack
+        while self.nbytes > self.max_bytes and self.undo_stack:
+            self.nbytes -= self.undo_stack.pop(0)[1]
+        while self.nbytes > self.max_bytes and self.redo_stack:
+            self.nbytes -= self.redo_stack.pop(0)[1]
+
+    def _drop(self, stack: list[tuple[dict[str, Any], int]]) -> None:
+        self.nbytes -= sum(nbytes for _, nbytes in stack)
+        stack.clear()
+
+
 def add_tooltip(obj, str_tooltip):
     obj.v_on = "tooltip.on"
     return v.Tooltip(
@@ -94,3 +567,110 @@ class IconAlert(v.VuetifyTemplate):  # type: ignore
         """
         should be overwrite by on_event
         """
+
+
+class VirtualScroller(v.VuetifyTemplate):  # type: ignore
+    """
+    Wrap a table and report the scroll position of its scrollable body in `scroll_top`,
+    so that only the visible rows need to be rendered
+    Only feasible with VuetifyTemplate
+
+    Example:
+    scroller = VirtualScroller(table=table)
+    scroller.observe(lambda change: ..., "scroll_top")
+    """
+
+    table = traitlets.Instance(ipw.DOMWidget).tag(sync=True, **widget_serialization)
+    scroll_top = traitlets.Int(0).tag(sync=True)
+
+    @traitlets.default("template")
+    def _template(self):
+        return """
+        <template>
+          <div>
+            <jupyter-widget :widget="table" />
+          </div>
+        </template>
+        <script>
+        module.exports = {
+            mounted() {
+                // scroll events do not bubble, they are caught during the capture phase
+                this.$el.addEventListener("scroll", this.on_scroll, true)
+            },
+            beforeDestroy() {
+                this.$el.removeEventListener("scroll", this.on_scroll, true)
+            },
+            methods: {
+                on_scroll(event) {
+                    if (!event.target.classList.contains("v-data-table__wrapper")) {
+                        return
+                    }
+                    // debounce to only sync the final position
+                    clearTimeout(this.timeout)
+                    this.timeout = setTimeout(() => {
+                        this.scroll_top = Math.round(event.target.scrollTop)
+                    }, 50)
+                }
+            },
+        }
+        </script>
+        """
+
+
+class ColumnarItems(v.VuetifyTemplate):  # type: ignore
+    """
+    Receive the items of a table as a binary buffer holding a json object of columns
+    and decode them in the frontend into the `items` of the table.
+    It avoids creating a python dict per row and repeating the column names in each row.
+    The widget renders nothing but needs to be displayed
+    Only feasible with VuetifyTemplate
+
+    Example:
+    columnar_items = ColumnarItems(table=table)
+    columnar_items.payload = b'{"a": [1, 2], "b": ["x", "y"]}'
+    """
+
+    table = traitlets.Instance(ipw.DOMWidget).tag(sync=True, **widget_serialization)
+    payload = traitlets.Bytes(b"").tag(sync=True)
+
+    @traitlets.default("template")
+    def _template(self):
+        return """
+        <template>
+          <span v-show="false"></span>
+        </template>
+        <script>
+        module.exports = {
+            inject: ["viewCtx"],
+            watch: {
+                payload() {
+                    this.update_items()
+                }
+            },
+            mounted() {
+                this.update_items()
+            },
+            methods: {
+                update_items() {
+                    if (!this.payload || !this.payload.byteLength) {
+                        return
+                    }
+                    const columns = JSON.parse(new TextDecoder().decode(this.payload))
+                    const names = Object.keys(columns)
+                    const nb_rows = names.length ? columns[names[0]].length : 0
+                    const items = Array.from(
+                        { length: nb_rows },
+                        (_, i) => Object.fromEntries(names.map((name) => [name, columns[name][i]]))
+                    )
+                    this.viewCtx.getModelById(this.table.substring(10)).then((model) => {
+                        model.set("items", items)
+                        // items are only needed by the frontend, do not sync them back to the kernel
+                        if (model._buffered_state_diff) {
+                            delete model._buffered_state_diff.items
+                        }
+                    })
+                }
+            },
+        }
+        </script>
+        """
@@ -1,4 +1,9 @@
-from typing import Any, cast
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Any
 
 import ipyvuetify as v
 import polars as pl
@@ -48,7 +53,7 @@ class VirtualAutocomplete(v.Content):
 
     @property
     def v_model(self):
-        v_model: list[Any] | None = [item[self.table_select.item_key] for item in self.table_select.v_model]
+        v_model: list[Any] | None = self.table_select.selected_keys.to_list()
         if self.table_select.single_select:
             if v_model:
                 v_model = v_model[0]
@@ -58,12 +63,17 @@ class VirtualAutocomplete(v.Content):
 
     @v_model.setter
     def v_model(self, value):
-        self.table_select.v_model = (
-            self.table_select.df.filter(pl.col(self.name + "__key").is_in(pl.lit(value)))
-            .select(set([self.table_select.item_key, self.table_select.row_nr]))
-            .collect()
-            .to_dicts()
-        )
+        values = value if isinstance(value, list) else [value]
+        if self.table_select.item_key == self.name + "__key":
+            # probe the index of the table
+            self.table_select.select(values)
+        else:
+            self.table_select.select(
+                self.table_select.df.filter(pl.col(self.name + "__key").is_in(pl.Series(values)))
+                .select(self.table_select.item_key)
+                .collect()
+                .to_series()
+            )
         self._update_text_field()
 
     def _on_menu_toggled(self, widget, event, data):
@@ -76,9 +86,16 @@ class VirtualAutocomplete(v.Content):
 
 
 class FileInput(v.Flex):
+    chunk_size = 8 * 2**20  # bytes requested to the browser at once
+    extensions = ("csv", "parquet", "ipc", "arrow", "feather", "ndjson", "json", "xlsx", "xls")
+
     def __init__(self, name=None, **kwargs):
         self.name = name
         self.file_input = _FileInput()
+        # uploads are streamed to disk and scanned from there, the files live as long as the widget
+        self._directory = Path(tempfile.mkdtemp(prefix="ipyvuetable-"))
+        weakref.finalize(self, shutil.rmtree, self._directory, ignore_errors=True)
+        self._uploads: list[list[Path]] = []  # files of the last uploads
         super().__init__(
             children=[
                 v.Html(tag="div", children=[name] if name else []),
@@ -96,21 +113,46 @@ class FileInput(v.Flex):
     def v_model(self, value): ...  # it is not possible to modify v_model from the back
 
     def load_dataframes(self) -> list[pl.DataFrame]:
+        return [df.collect() for df in self.scan_dataframes()]
+
+    def scan_dataframes(self) -> list[pl.LazyFrame]:
+        """
+        The uploaded files are copied chunk by chunk to a temporary file (the progress bar follows the copy)
+        and scanned lazily, they are never held in memory and can be larger than it in lazy mode.
+        """
+        # the previous upload can still be the source of a table until it is replaced, not the ones before
+        while len(self._uploads) > 1:
+            for path in self._uploads.pop(0):
+                path.unlink(missing_ok=True)
+        self._uploads.append([])
+
         dfs = []
         for file_info in self.file_input.get_files():
-            extension = file_info["name"].split(".")[-1]
-            bytes_data = cast(bytes, file_info["file_obj"].readall())
+            extension = file_info["name"].split(".")[-1].lower()
+            if extension not in self.extensions:
+                raise Exception(f"Extension {extension} is not supported, ")
+
+            fd, name = tempfile.mkstemp(suffix=f".{extension}", dir=self._directory)
+            os.close(fd)
+            path = Path(name)
+            self._uploads[-1].append(path)
+            with path.open("wb") as file:
+                shutil.copyfileobj(file_info["file_obj"], file, self.chunk_size)
+
             match extension:
-                case "json":
-                    data = pl.read_json(bytes_data)
                 case "csv":
-                    data = pl.read_csv(bytes_data, try_parse_dates=True)
+                    data = pl.scan_csv(path, try_parse_dates=True)
                 case "parquet":
-                    data = pl.read_parquet(bytes_data)
-                case ("xlsx", "xls"):
-                    data = pl.read_excel(bytes_data)
+                    data = pl.scan_parquet(path)
+                case "ipc" | "arrow" | "feather":
+                    data = pl.scan_ipc(path)
+                case "ndjson":
+                    data = pl.scan_ndjson(path)
+                # formats without a lazy reader
+                case "json":
+                    data = pl.read_json(path).lazy()
                 case _:
-                    raise Exception(f"Extension {extension} is not supported, ")
+                    data = pl.read_excel(path).lazy()
 
             dfs.append(data)
 
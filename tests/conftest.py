@@ -0,0 +1,32 @@
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def lazy(request):
+    return request.param
+
+
+@pytest.fixture
+def make_df():
+    def make_df(n: int = 200) -> pl.LazyFrame:
+        """unique keys "k" out of order (`n` must not be a multiple of 7), groups "g" and ties in "x" """
+        return pl.LazyFrame(
+            {
+                "k": [f"k{i * 7 % n}" for i in range(n)],
+                "g": [["a", "b", "c"][i % 3] for i in range(n)],
+                "x": [float(i % 17) for i in range(n)],
+            }
+        )
+
+    return make_df
+
+
+@pytest.fixture
+def make_table(make_df):
+    def make_table(n: int = 200, cls: type[Table] = Table, **kwargs) -> Table:
+        return cls(make_df(n), item_key="k", **kwargs)
+
+    return make_table
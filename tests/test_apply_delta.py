@@ -0,0 +1,36 @@
+import random
+
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+ROW_NR = "__row_nr__"
+
+
+def get_items(table: Table) -> list[dict]:
+    return [{c: item[c] for c in ["k", "g", "x"]} for item in table.items]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_apply_delta_matches_a_rebuild(seed, make_table):
+    rng = random.Random(seed)
+    table = make_table()
+    table._search("1")
+    for i in range(10):
+        keys = table.df.select("k").collect().to_series().sample(3, seed=seed * 10 + i)
+        table.apply_delta(
+            inserted=pl.DataFrame({"k": [f"new{i}"], "g": ["d"], "x": [float(i)]}),
+            updated=pl.DataFrame({"k": keys[:2], "x": [rng.random(), None]}),
+            deleted_keys=keys[2:],
+        )
+    rebuilt = Table(table.df.drop(ROW_NR), item_key="k")
+    rebuilt._search("1")
+
+    assert get_items(table) == get_items(rebuilt)
+    assert table.server_items_length == rebuilt.server_items_length
+    # the patched key index finds the rows as a scan would
+    keys = table.df.select("k").collect().to_series()
+    expected = table.df.filter(pl.col("k").is_in(keys[::5])).select(ROW_NR).collect().to_series().sort()
+    assert table._lookup_row_nrs(keys[::5]).sort().to_list() == expected.to_list()
+    assert len(table._lookup_row_nrs(["missing", None])) == 0
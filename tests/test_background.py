@@ -0,0 +1,141 @@
+import time
+
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+
+def wait(table: Table) -> None:
+    start = time.time()
+    while table.loading and time.time() - start < 30:
+        time.sleep(0.01)
+    assert not table.loading
+
+
+def get_items(table: Table, mode: str) -> list:
+    if mode == "background":
+        wait(table)
+    return [item["k"] for item in table.items]
+
+
+def change_page(table: Table, page: int) -> None:
+    table._on_change_option_data_table(
+        None, None, {"page": page, "itemsPerPage": 10, "sortBy": ["x"], "sortDesc": [True]}
+    )
+
+
+MODES = {"eager": {}, "lazy": {"lazy": True}, "background": {"background": True}}
+
+
+@pytest.fixture(params=list(MODES))
+def mode(request):
+    return request.param
+
+
+def test_modes_are_equivalent(mode, make_table):
+    reference = make_table(500)
+    table = make_table(500, **MODES[mode])
+
+    for t in [reference, table]:
+        change_page(t, 2)
+    assert get_items(table, mode) == get_items(reference, "eager")
+
+    for t in [reference, table]:
+        t._search("1")
+        # the frontend sends the options back when the page is reset by the filters
+        get_items(t, mode)
+        change_page(t, t.page)
+    assert get_items(table, mode) == get_items(reference, "eager")
+    assert table.server_items_length == reference.server_items_length
+
+
+def test_select_all_survives_a_filter_change(mode, make_table):
+    table = make_table(500, **MODES[mode])
+    table._search("9")
+    get_items(table, mode)
+    expected = table.df_search.collect()["k"].sort().to_list()
+
+    table.select_all()
+    # the second search supersedes the first one in background mode
+    table._search("1")
+    table._search("2")
+    get_items(table, mode)
+
+    assert table.selected_keys.sort().to_list() == expected
+    assert table.nb_selected == len(expected)
+
+
+def test_stale_refresh_leaves_the_selection(make_table):
+    table = make_table(500, background=True)
+    table.select_all()
+    table.filters["x"]._set_expr(pl.col("x") > 8)
+    # a refresh superseded by a newer one
+    stale_generation = table._generation
+    table._generation += 1
+    table._refresh_in_background(
+        stale_generation,
+        table._get_search_snapshot(),
+        table._get_search_key(),
+        table._get_sort_key(),
+        table._get_window(),
+        None,
+    )
+
+    assert table.is_select_all
+    assert table.nb_selected == 500
+
+
+def test_refresh_works_on_the_filters_of_its_request(lazy, make_table):
+    table = make_table(500, lazy=lazy, background=True)
+    wait(table)
+    x = table.filters["x"]
+    x._set_expr(pl.col("x") > 8, 8)
+    with table._lock:
+        table._generation += 1
+        generation = table._generation
+        snapshot, search_key = table._get_search_snapshot(), table._get_search_key()
+    # a filter applied from the comm thread while the refresh is computing
+    x._set_expr(pl.col("x") < 3, 3)
+    table._refresh_in_background(
+        generation, snapshot, search_key, table._get_sort_key(), table._get_window(), table._eager_df
+    )
+
+    assert table._search_key == search_key
+    assert table.df_search.collect()["x"].min() > 8
+    page = table._page_cache.get(table._get_page_key(table._get_window(), search_key, table._sort_key))
+    assert page[0]["x"].min() > 8
+    if not lazy:
+        assert x.get_bitmap().sum() == table._eager_df.select((pl.col("x") < 3).sum()).item()
+
+
+@pytest.mark.parametrize("background", [False, True], ids=["foreground", "background"])
+def test_debounced_search_waits_for_refreshes(background, make_table):
+    table = make_table(500, background=background)
+    table.search_debounce = 0.01
+    table._on_search(None, None, "12")
+    timer = table._search_timer
+    # the table is refreshed before the timer fires
+    table._refresh(search=True)
+    wait(table)
+    timer.join()
+
+    assert table.search_query is None
+    table._search_timer.join()
+    wait(table)
+    assert table.search_query == "12"
+    reference = make_table(500)
+    reference._search("12")
+    assert table.server_items_length == reference.server_items_length < 500
+
+
+def test_undo_drops_the_pending_search(make_table):
+    table = make_table(500)
+    table.search_debounce = 0.01
+    table._on_search(None, None, "12")
+    timer = table._search_timer
+    table._undo_all_filters()
+    timer.join()
+
+    assert table.search_query is None
+    assert table.server_items_length == 500
@@ -0,0 +1,41 @@
+import datetime
+
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def table(request):
+    df = pl.LazyFrame(
+        {
+            "empty": pl.Series([None, None, None], dtype=pl.Null),
+            "x": [1.5, None, 3.0],
+            "d": [datetime.date(2020, 1, 1), datetime.date(2021, 1, 1), None],
+            "tags": [["a"], [], None],
+        }
+    )
+    return Table(df, lazy=request.param)
+
+
+def test_stats(table):
+    stats = table.get_column_stats()
+
+    assert stats["empty"] == {"null_count": 3}
+    assert stats["x"]["null_count"] == 1
+    assert (stats["x"]["min"], stats["x"]["max"]) == (1.5, 3.0)
+    assert (stats["d"]["min"], stats["d"]["max"]) == (datetime.date(2020, 1, 1), datetime.date(2021, 1, 1))
+    assert stats["tags"] == {"null_count": 1}
+
+
+def test_range_filters_with_null_column(table):
+    slider = table.filters["x"]
+    slider.init_filter()
+    slider._update_filter()
+    assert (slider.filter_obj.min, slider.filter_obj.max) == (1, 3)
+
+    date = table.filters["d"]
+    date.init_filter()
+    date._update_filter()
+    assert date.default_range == [datetime.date(2020, 1, 1), datetime.date(2021, 1, 1)]
@@ -0,0 +1,10 @@
+import polars as pl
+
+from ipyvuetable import Table
+
+
+def test_columns_repr_of_a_page(make_df):
+    mapping = pl.LazyFrame({"g": ["a", "b"], "g__repr": ["A!", "B!"]})
+    table = Table(make_df(), columns_repr={"g": mapping})
+
+    assert [item["g"] for item in table.items[:4]] == ["A!", "B!", "c", "A!"]
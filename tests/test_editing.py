@@ -0,0 +1,92 @@
+import polars as pl
+import pytest
+
+from ipyvuetable import EditingTable, Table
+
+SCHEMA = {"k": pl.String, "g": pl.String, "x": pl.Float64}
+
+
+def get_rows(table: Table) -> list[tuple]:
+    return table.df.drop("__row_nr__").sort("k").collect().rows()
+
+
+@pytest.mark.parametrize("in_transaction", [False, True], ids=["direct", "transaction"])
+def test_edits_follow_the_schema(in_transaction, make_table):
+    table = make_table(3, cls=EditingTable)
+    rows = [pl.DataFrame({"k": ["k3"], "x": ["3"]}, schema={"k": pl.String, "x": pl.String})]
+    updates = [pl.DataFrame({"k": ["k0"], "g": [None]}), pl.DataFrame({"k": ["k1"], "x": [5]})]
+
+    if in_transaction:
+        with table.transaction():
+            table.create(rows[0])
+            for update in updates:
+                table.update(update)
+    else:
+        table.create(rows[0])
+        for update in updates:
+            table.update(update)
+
+    assert table.schema == SCHEMA
+    assert get_rows(table) == [("k0", None, 0.0), ("k1", "b", 5.0), ("k2", "c", 2.0), ("k3", None, 3.0)]
+
+
+def test_dtypes_of_a_delta_do_not_rebuild_df(monkeypatch, make_table):
+    table = make_table(3, cls=EditingTable)
+    rebuilds = []
+    monkeypatch.setattr(table, "_update_df", rebuilds.append)
+
+    table.apply_delta(
+        inserted=pl.DataFrame(
+            {"k": ["k3"], "g": ["d"], "x": [3]}, schema={"k": pl.String, "g": pl.String, "x": pl.Int32}
+        ),
+        updated=pl.DataFrame({"k": ["k0"], "x": [None]}),
+    )
+
+    assert not rebuilds
+    assert table.schema == SCHEMA
+    assert get_rows(table) == [("k0", "a", None), ("k1", "b", 1.0), ("k2", "c", 2.0), ("k3", "d", 3.0)]
+
+
+def test_new_column_rebuilds_df(monkeypatch, make_table):
+    table = make_table(3, cls=EditingTable)
+    rebuilds = []
+    monkeypatch.setattr(table, "_update_df", rebuilds.append)
+    table.apply_delta(inserted=pl.DataFrame({"k": ["k3"], "w": [True]}))
+
+    assert len(rebuilds) == 1
+
+
+def edit_selection(table: EditingTable, values: dict) -> None:
+    table._on_click_edit_item_btn(None, None, None)
+    for c, value in values.items():
+        table.dialog_widgets[c].v_model = value
+    table._on_save_dialog(None, None, None)
+
+
+def test_multi_edit_of_select_all(lazy, make_table):
+    table = make_table(1000, cls=EditingTable, lazy=lazy)
+    table._search("1")
+    table.select_all()
+    excluded = table.df_search.head(2).collect()
+    table._set_excluded(excluded.get_column("__row_nr__"))
+    expected = table.df_selected.select("k").collect().to_series().sort().to_list()
+
+    edit_selection(table, {"g": "z"})
+
+    assert table.new_items is None
+    edited = table.df.filter(pl.col("g") == "z").select("k").collect().to_series().sort().to_list()
+    assert edited == expected
+    assert not set(excluded["k"]) & set(edited) and len(edited) > 100
+
+    table.undo()
+    assert table.df.filter(pl.col("g") == "z").collect().height == 0
+
+
+def test_multi_edit_of_selected_rows(make_table):
+    table = make_table(3, cls=EditingTable)
+    table.select(["k0", "k2"])
+
+    edit_selection(table, {"x": 9})
+
+    assert [item["k"] for item in table.new_items] == ["k0", "k2"]
+    assert get_rows(table) == [("k0", "a", 9.0), ("k1", "b", 1.0), ("k2", "c", 9.0)]
@@ -0,0 +1,18 @@
+import polars as pl
+
+from ipyvuetable import Table
+
+
+def test_facets_count_the_rows_under_the_other_filters(make_df):
+    table = Table(make_df())
+    table.filters["k"].init_filter()
+    table.filters["g"].init_filter()
+    table.filters["g"]._set_expr(pl.col("g") == "a", ("is_in", ["a"]))
+    table.filters["x"]._set_expr(pl.col("x") < 5, ("between", 0, 5))
+    facets = table.get_facets()
+
+    expected = table.df.filter(pl.col("x") < 5).group_by("g").len("#").sort("g").collect()
+    assert facets["g"].sort("g").rows() == expected.rows()
+    assert (
+        facets["k"]["#"].sum() == table.df.filter((pl.col("x") < 5) & (pl.col("g") == "a")).collect().height
+    )
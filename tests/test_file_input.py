@@ -0,0 +1,86 @@
+import io
+
+import polars as pl
+import pytest
+
+from ipyvuetable import EditingTable
+from ipyvuetable.widgets import FileInput
+
+DF = pl.DataFrame({"k": range(100), "s": [f"v{i}" for i in range(100)]})
+
+
+class ChunkedFile(io.BytesIO):
+    """file object of an upload, records the sizes of the reads"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads: list[int] = []
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return super().read(size)
+
+
+def upload(file_input: FileInput, name: str, data: bytes) -> ChunkedFile:
+    file_obj = ChunkedFile(data)
+    file_input.file_input.get_files = lambda: [{"name": name, "file_obj": file_obj}]
+    return file_obj
+
+
+def to_bytes(write) -> bytes:
+    buffer = io.BytesIO()
+    write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("name", "write"),
+    [
+        ("a.csv", DF.write_csv),
+        ("a.parquet", DF.write_parquet),
+        ("a.ipc", DF.write_ipc),
+        ("a.ndjson", DF.write_ndjson),
+    ],
+)
+def test_uploads_are_copied_by_chunks_and_scanned(name, write):
+    file_input = FileInput()
+    file_input.chunk_size = 64
+    file_obj = upload(file_input, name, to_bytes(write))
+
+    (df,) = file_input.scan_dataframes()
+
+    assert isinstance(df, pl.LazyFrame)
+    assert df.collect().equals(DF)
+    assert set(file_obj.reads) == {64}
+
+
+def test_only_the_previous_upload_is_kept():
+    file_input = FileInput()
+    paths = []
+    for _ in range(3):
+        upload(file_input, "a.csv", to_bytes(DF.write_csv))
+        file_input.scan_dataframes()
+        paths.append(file_input._uploads[-1][0])
+
+    assert [path.exists() for path in paths] == [False, True, True]
+
+
+def test_unsupported_extension():
+    file_input = FileInput()
+    upload(file_input, "a.txt", b"")
+    with pytest.raises(Exception, match="not supported"):
+        file_input.scan_dataframes()
+
+
+def test_closing_the_menu_uploads_new_files_once():
+    table = EditingTable(pl.LazyFrame({"k": [1]}), item_key="k")
+    menu = table.actions["upload"]["obj"]
+    upload(table.upload_btn, "a.parquet", to_bytes(DF.write_parquet))
+    # the frontend sends the new file info
+    table.upload_btn.file_input.version += 1
+    for _ in range(2):
+        menu.v_model = True
+        menu.v_model = False
+
+    assert table.df_height == DF.height
+    assert len(table.upload_btn._uploads) == 1
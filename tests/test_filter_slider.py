@@ -0,0 +1,60 @@
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+
+@pytest.fixture
+def slider():
+    values = [float(i) for i in range(101)] + [float("nan"), None]
+    table = Table(pl.LazyFrame({"x": values}))
+    slider = table.filters["x"]
+    slider.nb_bins = 10
+    slider.init_filter()
+    slider._update_filter()
+    return slider
+
+
+def get_preview(slider, min_: int, max_: int) -> str:
+    slider.filter_obj.v_model = [min_, max_]
+    return slider.preview.children[0]
+
+
+def count_rows(slider, min_: int, max_: int) -> int:
+    return slider.table.df.filter(pl.col("x").is_between(min_, max_)).collect().height
+
+
+def test_histogram_skips_nan(slider):
+    assert sum(slider._counts) == 101
+    assert get_preview(slider, 0, 100) == "101 rows match"
+
+
+@pytest.mark.parametrize(("min_", "max_"), [(10, 100), (0, 100), (30, 100), (90, 100)])
+def test_preview_is_exact_on_the_bin_edges(slider, min_, max_):
+    assert get_preview(slider, min_, max_) == f"{count_rows(slider, min_, max_):,} rows match"
+
+
+@pytest.mark.parametrize(("min_", "max_"), [(15, 100), (10, 50), (0, 55), (100, 100)])
+def test_preview_is_labelled_as_an_estimate_inside_a_bin(slider, min_, max_):
+    preview = get_preview(slider, min_, max_)
+    assert preview.startswith("about ")
+    assert abs(int(preview.split()[1]) - count_rows(slider, min_, max_)) <= 10
+
+
+def test_quantile_edges_skip_nan(slider):
+    slider.binning = "quantile"
+    slider._edges = None
+    slider._update_histogram()
+
+    assert slider._get_edges()[-1] == 100
+    assert sum(slider._counts) == 101
+
+
+def test_delete_refreshes_the_range():
+    table = Table(pl.LazyFrame({"k": [1, 2, 3], "x": [1.0, 5.0, 9.0]}), item_key="k")
+    slider = table.filters["x"]
+    slider.init_filter()
+    slider._update_filter()
+    table.apply_delta(deleted_keys=[3])
+
+    assert (slider.filter_obj.min, slider.filter_obj.max) == (1.0, 5.0)
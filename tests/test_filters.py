@@ -0,0 +1,84 @@
+import datetime
+
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+ROW_NR = "__row_nr__"
+
+
+def open_filter(table: Table, name: str):
+    filter_ = table.filters[name]
+    filter_.menu.v_model = True
+    return filter_
+
+
+def search_options(filter_, query: str) -> list:
+    filter_._search(query)
+    return [item[filter_.name + "__key"] for item in filter_.filter_obj.items]
+
+
+@pytest.mark.parametrize(
+    ("values", "query", "expected"),
+    [
+        ([datetime.timedelta(days=1), datetime.timedelta(hours=2), None], "1d", ["1d"]),
+        ([{"a": 1}, {"a": 22}, None], "22", [{"a": 22}]),
+        ([b"abc", b"xyz", None], "xy", [b"xyz"]),
+        ([[[1, 2]], [[3, 33]], None], "33", [[3, 33]]),
+        (["Foo", "bar", None], "FO", ["Foo"]),
+    ],
+    ids=["duration", "struct", "binary", "nested_list", "string"],
+)
+@pytest.mark.filterwarnings("error::polars.exceptions.PolarsInefficientMapWarning")
+def test_combobox_search(values, query, expected):
+    table = Table(pl.LazyFrame({"c": values}))
+    filter_ = open_filter(table, "c")
+
+    assert len(filter_.filter_obj.items) == len(values)
+    assert search_options(filter_, query) == expected
+
+
+def test_debounced_search_waits_for_new_options():
+    table = Table(pl.LazyFrame({"c": ["Foo", "bar", "food", None]}))
+    filter_ = open_filter(table, "c")
+    filter_.search_debounce = 0.01
+    filter_._on_search("foo")
+    timer = filter_._search_timer
+    # the options are recomputed before the timer fires
+    filter_._update_filter()
+    timer.join()
+    assert len(filter_.filter_obj.items) == 4
+
+    filter_._search_timer.join()
+    assert sorted(item["c__key"] for item in filter_.filter_obj.items) == ["Foo", "food"]
+
+
+def test_undo_drops_the_pending_search():
+    table = Table(pl.LazyFrame({"c": ["Foo", "bar", "food", None]}))
+    filter_ = open_filter(table, "c")
+    filter_.search_debounce = 0.01
+    filter_._on_search("foo")
+    timer = filter_._search_timer
+    filter_._undo()
+    timer.join()
+
+    assert len(filter_.filter_obj.items) == 4
+
+
+def test_modify_filter_before_the_menu_is_opened(lazy):
+    table = Table(pl.LazyFrame({"c": ["a", "b", "a"]}), lazy=lazy)
+    table.filters["c"].modify_filter(["a"]).apply_mask()
+
+    assert table.server_items_length == 2
+
+
+@pytest.mark.parametrize(("mode", "expected"), [("any", [0, 1, 3, 4]), ("all", [1])])
+def test_list_combobox(mode, expected):
+    table = Table(pl.LazyFrame({"tags": [["a"], ["a", "b"], ["c"], [], None, ["b", "b"]]}))
+    filter_ = open_filter(table, "tags")
+    filter_.mode.v_model = mode
+    filter_.filter_obj.select(["a", None] if mode == "any" else ["a", "b"])
+    filter_.apply_mask()
+
+    assert [item[ROW_NR] for item in table.items] == expected
@@ -0,0 +1,111 @@
+import random
+
+import polars as pl
+import pytest
+
+from ipyvuetable import EditingTable
+from ipyvuetable.utils import EditJournal
+
+ROW_NR = "__row_nr__"
+
+
+def get_rows(table: EditingTable) -> list[tuple]:
+    return table.df.drop(ROW_NR).collect().rows()
+
+
+def random_edit(table: EditingTable, rng: random.Random, i: int) -> None:
+    on = table.item_key
+    kind = rng.choice(["update", "insert", "delete"])
+    if kind == "update" or not table.df_height:
+        keys = table.df.select(on).collect().to_series().sample(min(3, table.df_height), seed=i)
+        table.apply_delta(updated=pl.DataFrame({on: keys, "a": [-i] * len(keys)}), on=on)
+    elif kind == "insert":
+        table.apply_delta(inserted=pl.DataFrame({"k": [f"new{i}"], "a": [i], "b": ["z"]}))
+    else:
+        keys = table.df.select(on).collect().to_series().sample(min(2, table.df_height), seed=i)
+        table.delete(keys)
+
+
+@pytest.mark.parametrize("item_key", ["k", None], ids=["keyed", "row_nr"])
+def test_undo_redo_round_trip(lazy, item_key):
+    rng = random.Random(0)
+    df = pl.LazyFrame({"k": [f"k{i}" for i in range(30)], "a": range(30), "b": ["x"] * 30})
+    table = EditingTable(df, item_key=item_key, lazy=lazy)
+    states = [get_rows(table)]
+    for i in range(12):
+        random_edit(table, rng, i)
+        states.append(get_rows(table))
+
+    for state in reversed(states[:-1]):
+        table.undo()
+        assert get_rows(table) == state
+    assert table.actions["undo"]["obj"].disabled
+
+    for state in states[1:]:
+        table.redo()
+        assert get_rows(table) == state
+    assert table.actions["redo"]["obj"].disabled
+
+
+def test_undo_of_a_delete_keeps_the_order(lazy):
+    table = EditingTable(pl.LazyFrame({"k": [1, 2, 3, 4]}), item_key="k", lazy=lazy)
+    table.select([4])
+    table.delete([2, 3])
+    table.undo()
+
+    assert table.df.collect()["k"].to_list() == [1, 2, 3, 4]
+    assert table.selection.to_list() == [3]
+
+
+def test_transaction_is_undone_at_once():
+    table = EditingTable(pl.LazyFrame({"k": ["a", "b", "c"], "a": [1, 2, 3]}), item_key="k")
+    with table.transaction():
+        table.update([{"k": "a", "a": 10}])
+        table.delete(["b"])
+        table.create([{"k": "d", "a": 4}])
+    assert get_rows(table) == [("a", 10), ("c", 3), ("d", 4)]
+
+    table.undo()
+    assert sorted(get_rows(table)) == [("a", 1), ("b", 2), ("c", 3)]
+
+
+def test_rollback_drops_the_edits():
+    table = EditingTable(pl.LazyFrame({"k": ["a", "b"], "a": [1, 2]}), item_key="k")
+    with pytest.raises(ValueError), table.transaction():
+        table.update([{"k": "a", "a": 10}])
+        raise ValueError
+    assert get_rows(table) == [("a", 1), ("b", 2)]
+    assert not table.journal.undo_stack
+
+
+def test_new_edit_drops_the_redo_history():
+    table = EditingTable(pl.LazyFrame({"k": ["a", "b"], "a": [1, 2]}), item_key="k")
+    table.update([{"k": "a", "a": 10}])
+    table.undo()
+    table.update([{"k": "b", "a": 20}])
+
+    assert not table.journal.redo_stack
+    assert len(table.journal.undo_stack) == 1
+
+
+def test_history_is_dropped_when_df_is_replaced():
+    table = EditingTable(pl.LazyFrame({"k": ["a", "b"], "a": [1, 2]}), item_key="k")
+    table.update([{"k": "a", "a": 10}])
+    table.df = pl.LazyFrame({"k": ["x"], "a": [0]})
+    table.undo()
+
+    assert get_rows(table) == [("x", 0)]
+    assert table.actions["undo"]["obj"].disabled
+
+
+def test_journal_budget_evicts_the_oldest_edits():
+    journal = EditJournal(max_bytes=1000)
+    deltas = [{"updated": pl.DataFrame({"a": range(50)}), "on": "a"} for _ in range(5)]
+    for version, delta in enumerate(deltas):
+        journal.record(delta, version, version + 1)
+
+    assert journal.nbytes <= 1000
+    assert [delta for delta, _ in journal.undo_stack] == deltas[-len(journal.undo_stack) :]
+    assert journal.pop(journal.undo_stack, 5) is deltas[-1]
+    # an entry recorded for another version of df is not applied
+    assert journal.pop(journal.undo_stack, 42) is None
@@ -0,0 +1,67 @@
+import polars as pl
+import pytest
+
+from ipyvuetable import EditingTable, Table
+
+ROW_NR = "__row_nr__"
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.parquet"
+    pl.DataFrame(
+        {"k": range(1000), "x": [float(i % 97) for i in range(1000)], "s": [str(i % 13) for i in range(1000)]}
+    ).write_parquet(path, row_group_size=100)
+    return pl.scan_parquet(path)
+
+
+def get_page(table: Table, page: int, sort_by: list[str]) -> list[dict]:
+    table._on_change_option_data_table(
+        None, None, {"page": page, "itemsPerPage": 10, "sortBy": sort_by, "sortDesc": [True] * len(sort_by)}
+    )
+    return table.items
+
+
+def apply_slider(table: Table, min_: int, max_: int) -> None:
+    slider = table.filters["x"]
+    slider.init_filter()
+    slider._update_filter()
+    slider.filter_obj.v_model = [min_, max_]
+    slider.apply_mask()
+
+
+def test_filters_are_pushed_down_to_the_scan(source):
+    table = Table(source, item_key="k", lazy=True)
+    apply_slider(table, 10, 20)
+
+    plan = table.df_search.explain()
+    assert "SELECTION" in plan.split("Parquet SCAN")[-1]
+    assert table.filter_expr is not None
+    assert table.server_items_length == source.filter(pl.col("x").is_between(10, 20)).collect().height
+
+
+@pytest.mark.parametrize("sort_by", [[], ["x"], ["s", "x"]])
+def test_lazy_pages_match_eager_pages(source, sort_by):
+    lazy = Table(source, item_key="k", lazy=True)
+    eager = Table(source, item_key="k")
+    for table in [lazy, eager]:
+        apply_slider(table, 5, 60)
+        table._search("3")
+
+    for page in [1, 2, 7]:
+        assert get_page(lazy, page, sort_by) == get_page(eager, page, sort_by)
+    assert lazy.server_items_length == eager.server_items_length
+
+
+def test_lazy_edits_match_eager_edits(source):
+    tables = [EditingTable(source, item_key="k", lazy=lazy) for lazy in [False, True]]
+    for table in tables:
+        apply_slider(table, 0, 50)
+        table.update([{"k": 3, "x": 99.0}])
+        table.delete([4, 5])
+        table.create([{"k": 1000, "x": 1.0, "s": "new"}])
+
+    eager, lazy = tables
+    assert lazy._eager_df is None
+    assert lazy.df.collect().equals(eager.df.collect())
+    assert get_page(lazy, 1, ["x"]) == get_page(eager, 1, ["x"])
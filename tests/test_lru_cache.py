@@ -0,0 +1,40 @@
+import threading
+
+from ipyvuetable.utils import LRUCache
+
+
+def test_least_recently_used_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get("b", "missing") == "missing"
+
+
+def test_keys_only_need_equality():
+    cache = LRUCache(maxsize=4)
+    cache.put((1, ["x", ("between", 0, 5)]), "page")
+    cache.put((1, ["x", ("between", 0, 5)]), "new page")
+
+    assert cache.get((1, ["x", ("between", 0, 5)])) == "new page"
+    assert len(cache._entries) == 1
+    cache.clear()
+    assert (1, ["x", ("between", 0, 5)]) not in cache
+
+
+def test_concurrent_puts_keep_the_size():
+    cache = LRUCache(maxsize=8)
+    threads = [
+        threading.Thread(target=lambda i=i: [cache.put((i, j), j) for j in range(200)]) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache._entries) == 8
@@ -0,0 +1,20 @@
+import time
+
+from ipyvuetable import Table
+
+
+def test_neighbour_pages_are_prefetched(make_df):
+    table = Table(make_df())
+    table._on_change_option_data_table(
+        None, None, {"page": 2, "itemsPerPage": 10, "sortBy": ["x"], "sortDesc": [False]}
+    )
+    next_key = table._get_page_key((20, 10), table._search_key, table._sort_key)
+    start = time.time()
+    while next_key not in table._page_cache and time.time() - start < 5:
+        time.sleep(0.01)
+
+    page = table._page_cache.get(next_key)
+    table._on_change_option_data_table(
+        None, None, {"page": 3, "itemsPerPage": 10, "sortBy": ["x"], "sortDesc": [False]}
+    )
+    assert table.items == page[1]
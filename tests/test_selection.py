@@ -0,0 +1,108 @@
+import time
+
+import polars as pl
+import pytest
+
+import ipyvuetable.table
+from ipyvuetable import EditingTable, Table
+
+
+def test_delete_every_selected_row(lazy):
+    table = EditingTable(pl.LazyFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]}), item_key="id", lazy=lazy)
+    table.select([1, 2, 3])
+    table.delete([1, 2, 3])
+
+    assert table.df_height == 0
+    assert table.nb_selected == 0
+
+
+def test_assign_empty_df_with_selection(lazy):
+    table = Table(pl.LazyFrame({"id": [1, 2, 3]}), item_key="id", lazy=lazy)
+    table.select([1, 2])
+    table.df = pl.LazyFrame(schema={"id": pl.Int64})
+
+    assert table.nb_selected == 0
+
+
+def test_select_keys(lazy):
+    table = Table(pl.LazyFrame({"id": [5, 3, 9, 1]}), item_key="id", lazy=lazy)
+    table.select([9, 1, 42])
+
+    assert sorted(table.selected_keys.to_list()) == [1, 9]
+
+
+def test_select_row_nrs_ignores_invalid_keys(lazy):
+    table = Table(pl.LazyFrame({"v": [1, 2, 3]}), lazy=lazy)
+    table.select([-1, 1, None, 7])
+
+    assert table.selected_keys.to_list() == [1]
+
+
+@pytest.mark.parametrize("item_key", [None, "id"], ids=["row_nr", "id"])
+def test_filters_keep_the_selection(lazy, item_key):
+    df = pl.LazyFrame({"id": [10, 11, 12, 13], "name": ["apple", "banana", "cherry", "mango"]})
+    table = Table(df, item_key=item_key, lazy=lazy)
+    key = table.item_key
+    table.select([10, 12] if item_key else [0, 2])
+
+    # the selected rows are hidden by the search
+    table._search("an")
+    assert table.server_items_length == 2
+    assert table.df_selected.collect()["name"].sort().to_list() == ["apple", "cherry"]
+
+    # a row selected in the filtered view is added to the hidden ones
+    row = next(item for item in table.items if item["name"] == "mango")
+    table.select([*table.selected_keys, row[key]])
+    table._search(None)
+    assert table.df_selected.collect()["name"].sort().to_list() == ["apple", "cherry", "mango"]
+
+
+def test_filter_on_selected_follows_the_filters(lazy):
+    table = Table(pl.LazyFrame({"name": ["apple", "banana", "cherry", "mango"]}), lazy=lazy)
+    table.select([0, 1, 3])
+    table.filter_on_selected = True
+    table._apply_filters()
+    assert table.server_items_length == 3
+
+    table._search("an")
+    assert sorted(item["name"] for item in table.items) == ["banana", "mango"]
+    table._search(None)
+    assert table.server_items_length == 3
+
+
+def test_clicks_do_not_scan_the_source():
+    nb_scans = []
+    source = pl.LazyFrame({"id": list(range(100, 130)), "x": list(range(30))}).map_batches(
+        lambda df: nb_scans.append(1) or df
+    )
+    table = Table(source, item_key="id", lazy=True)
+    page = table.items
+    # the next page is prefetched in background
+    next_key = table._get_page_key((10, 10), table._search_key, table._sort_key)
+    start = time.time()
+    while next_key not in table._page_cache and time.time() - start < 5:
+        time.sleep(0.01)
+    nb_scans.clear()
+
+    table._on_input_table(None, None, [page[2]])
+    table._on_input_table(None, None, [page[2], page[5]])
+
+    assert not nb_scans
+    assert table.selected_keys.to_list() == [page[2]["id"], page[5]["id"]]
+
+
+def test_shift_click_selects_the_rows_in_between(monkeypatch, make_table):
+    table = make_table()
+    # the shift key is only reported with ipyevents
+    monkeypatch.setattr(ipyvuetable.table, "Event", object)
+    table._on_change_option_data_table(
+        None, None, {"page": 1, "itemsPerPage": 10, "sortBy": ["x"], "sortDesc": [True]}
+    )
+    page = table.items
+
+    table.event = {"shiftKey": False}
+    table._on_input_table(None, None, [page[2]])
+    table.event = {"shiftKey": True}
+    table._on_input_table(None, None, [page[2], page[7]])
+
+    assert sorted(table.selected_keys.to_list()) == sorted(item["k"] for item in page[2:8])
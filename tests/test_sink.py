@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+
+import polars as pl
+
+from ipyvuetable import EditingTable
+from ipyvuetable.utils import ChangeSet, ChangeSetSink, ParquetChangeWriter, SQLiteChangeWriter
+
+SCHEMA = {"k": pl.String, "g": pl.String, "x": pl.Float64}
+
+
+def test_change_set_net_effect(make_df):
+    df = make_df(20).collect()
+    change_set = ChangeSet("k", SCHEMA)
+    change_set.update(pl.DataFrame({"k": ["k1"], "x": [-1.0]}))
+    change_set.update(pl.DataFrame({"k": ["k1", "k2"], "g": ["y", "z"]}))
+    change_set.create(pl.DataFrame({"k": ["new"], "x": [1.0]}))
+    change_set.update(pl.DataFrame({"k": ["new"], "g": ["q"]}))
+    change_set.delete(pl.Series(["k2", "k3"]))
+
+    inserted, updated, deleted_keys = change_set.resolve(lambda keys: df.filter(pl.col("k").is_in(keys)))
+
+    assert inserted.rows() == [("new", "q", 1.0)]
+    assert updated.rows() == [("k1", "y", -1.0)]
+    assert deleted_keys.to_list() == ["k2", "k3"]
+
+
+def test_sqlite_writer_follows_the_table(tmp_path, lazy, make_df):
+    df = make_df(20).collect()
+    path = tmp_path / "db.sqlite"
+    writer = SQLiteChangeWriter(path, "t")
+    writer(df, pl.DataFrame(schema={"k": pl.String}), pl.Series("k", [], dtype=pl.String))
+    sink = ChangeSetSink(writer, max_rows=5, max_delay=None)
+    table = EditingTable(df.lazy(), item_key="k", lazy=lazy, sink=sink)
+
+    table.update([{"k": "k1", "x": -1}])
+    table.update([{"k": "k1", "g": "y"}, {"k": "k2", "x": -2}])
+    table.create([{"k": "new", "x": 1, "g": "q"}])
+    table.delete(["k0", "k3"])
+    table.update(pl.DataFrame({"k": [f"k{i}" for i in range(10, 20)], "x": 0.0}))
+    sink.flush()
+
+    rows = sqlite3.connect(path).execute("SELECT k, g, x FROM t ORDER BY k").fetchall()
+    assert rows == table.df.drop("__row_nr__").sort("k").collect().rows()
+
+
+def test_parquet_writer_numbers_the_batches(tmp_path, make_table):
+    writer = ParquetChangeWriter(tmp_path)
+    sink = ChangeSetSink(writer, max_delay=None)
+    table = make_table(20, cls=EditingTable, sink=sink)
+    table.delete(["k0"])
+    sink.flush()
+    table.update([{"k": "k1", "x": -1}])
+    sink.flush()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "000000-deleted.parquet",
+        "000001-updated.parquet",
+    ]
+    assert ParquetChangeWriter(tmp_path).batch == 2
+    assert pl.read_parquet(tmp_path / "000001-updated.parquet").rows() == [("k1", -1.0)]
+
+
+def test_timer_flush_does_not_read_the_table(make_table):
+    batches = []
+    flushed = threading.Event()
+
+    def write(*batch):
+        batches.append(batch)
+        flushed.set()
+
+    sink = ChangeSetSink(write, max_delay=0.05)
+    table = make_table(20, cls=EditingTable, sink=sink)
+    threads = []
+    get_rows = table._get_rows_by_key
+    sink._get_rows = lambda keys: threads.append(threading.current_thread()) or get_rows(keys)
+
+    table.update([{"k": "k1", "x": -1}])
+    table.update([{"k": "k1", "g": "y"}])
+    assert flushed.wait(5)
+
+    assert threads == [threading.main_thread()] * 2
+    assert batches[0][1].rows() == [("k1", "y", -1.0)]
+
+
+def test_upload_is_streamed_in_batches(lazy, make_df, make_table):
+    batches = []
+    sink = ChangeSetSink(lambda *batch: batches.append(batch), max_rows=10, max_delay=None)
+    table = make_table(3, cls=EditingTable, lazy=lazy, sink=sink)
+    uploaded = make_df(36).with_columns(pl.col("x") * 2)
+
+    table._upload(uploaded)
+    sink.flush()
+
+    inserted = [batch[0] for batch in batches]
+    assert max(df.height for df in inserted) <= 10
+    assert pl.concat(inserted).sort("k").rows() == uploaded.sort("k").collect().rows()
+    assert pl.concat([batch[2] for batch in batches]).sort().to_list() == ["k0", "k1", "k2"]
@@ -0,0 +1,78 @@
+import random
+
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+ROW_NR = "__row_nr__"
+
+
+def make_table(values: list, lazy: bool) -> Table:
+    table = Table(pl.LazyFrame({"x": values, "y": range(len(values))}), lazy=lazy)
+    table.top_k_max_rows = 300
+    return table
+
+
+def get_page(table: Table, sort_by: list[str], sort_desc: list[bool], page: int, items_per_page: int) -> list:
+    table._on_change_option_data_table(
+        None, None, {"page": page, "itemsPerPage": items_per_page, "sortBy": sort_by, "sortDesc": sort_desc}
+    )
+    return [item["y"] for item in table.items]
+
+
+def full_sort(values: list, sort_by: list[str], sort_desc: list[bool]) -> list:
+    # y breaks the ties: the sort of the table is stable
+    df = pl.DataFrame({"x": values, "y": range(len(values))}, schema={"x": pl.Float64, "y": pl.Int64})
+    return df.sort([*sort_by, "y"], descending=[*sort_desc, False], nulls_last=True)["y"].to_list()
+
+
+@pytest.mark.parametrize("desc", [False, True])
+@pytest.mark.parametrize("nb_values", [0, 5, 12, 60])
+def test_pages_match_full_sort_with_nulls(lazy, desc, nb_values):
+    rng = random.Random(nb_values)
+    values = [float(rng.randint(0, 20)) for _ in range(nb_values)] + [None] * (100 - nb_values)
+    rng.shuffle(values)
+    table = make_table(values, lazy)
+    expected = full_sort(values, ["x"], [desc])
+
+    for page, items_per_page in [(1, 10), (2, 10), (6, 10), (10, 10), (1, 50), (2, 50)]:
+        start = (page - 1) * items_per_page
+        assert (
+            get_page(table, ["x"], [desc], page, items_per_page) == expected[start : start + items_per_page]
+        )
+
+
+def test_pages_match_full_sort_with_nan(lazy):
+    rng = random.Random(0)
+    values = [rng.choice([None, float("nan"), *map(float, range(10))]) for _ in range(200)]
+    table = make_table(values, lazy)
+
+    for desc in [False, True]:
+        expected = full_sort(values, ["x"], [desc])
+        for page in [1, 5, 20]:
+            assert get_page(table, ["x"], [desc], page, 10) == expected[(page - 1) * 10 : page * 10]
+
+
+def test_sort_permutations_are_cached_and_flipped(make_df):
+    table = Table(make_df(), item_key="k")
+    table.top_k_max_rows = 0  # always sort fully
+    table._search("1")
+    ascending = get_sorted_keys(table, False)
+    permutation = table.sort_permutation
+    descending = get_sorted_keys(table, True)
+
+    # the ties are kept in the order of df in both directions
+    expected = table.df_search.sort(["x", ROW_NR], descending=[True, False]).select("k").collect().to_series()
+    assert descending == expected.head(10).to_list()
+    expected = table.df_search.sort(["x", ROW_NR]).select("k").collect().to_series()
+    assert ascending == expected.head(10).to_list()
+    get_sorted_keys(table, False)
+    assert table.sort_permutation is permutation
+
+
+def get_sorted_keys(table: Table, desc: bool) -> list[str]:
+    table._on_change_option_data_table(
+        None, None, {"page": 1, "itemsPerPage": 10, "sortBy": ["x"], "sortDesc": [desc]}
+    )
+    return [item["k"] for item in table.items]
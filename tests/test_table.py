@@ -0,0 +1,20 @@
+import polars as pl
+
+from ipyvuetable import Table
+
+ROW_NR = "__row_nr__"
+
+
+def test_filter_bitmaps_are_cached_by_state(make_df):
+    table = Table(make_df())
+    x, g = table.filters["x"], table.filters["g"]
+    x._set_expr(pl.col("x") > 8, ("between", 8, 16))
+    g._set_expr(pl.col("g") != "b", ("is_in", ["a", "c"]))
+    table._apply_filters()
+    bitmap = x.get_bitmap()
+
+    expected = table.df.filter((pl.col("x") > 8) & (pl.col("g") != "b")).select(ROW_NR).collect()
+    assert table.df_search.select(ROW_NR).collect().equals(expected)
+    g._set_expr(None)
+    table._apply_filters()
+    assert x.get_bitmap() is bitmap
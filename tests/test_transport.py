@@ -0,0 +1,12 @@
+import json
+
+from ipyvuetable import Table
+
+
+def test_columnar_transport_sends_the_same_rows(make_df):
+    json_table = Table(make_df())
+    columnar_table = Table(make_df(), transport="columnar")
+    columns = json.loads(columnar_table.columnar_items.payload)
+
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    assert rows == json_table.items
@@ -0,0 +1,62 @@
+import random
+
+import polars as pl
+import pytest
+
+from ipyvuetable.utils import TrigramIndex
+
+QUERIES = ["bab", "aaa", "abab", "ab", "b", "", "aBa", "xyz", "é"]
+
+
+def random_texts(rng: random.Random, n: int) -> list[str | None]:
+    return [
+        None if rng.random() < 0.1 else "".join(rng.choice("abAé") for _ in range(rng.randint(0, 8)))
+        for _ in range(n)
+    ]
+
+
+def expected(df: pl.DataFrame, query: str) -> list[bool]:
+    return (
+        df.select(
+            pl.any_horizontal(
+                pl.col(c).str.to_lowercase().str.contains(query.lower(), literal=True).fill_null(False)
+                for c in df.columns
+            )
+        )
+        .to_series()
+        .to_list()
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_search_matches_str_contains(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 40)
+    df = pl.DataFrame(
+        {"a": random_texts(rng, n), "b": random_texts(rng, n)}, schema={"a": pl.String, "b": pl.String}
+    )
+    index = TrigramIndex(dict(df.schema)).update(df)
+
+    for query in QUERIES:
+        assert index.search(query).to_list() == expected(df, query), query
+
+
+def test_incremental_update():
+    rng = random.Random(0)
+    schema = {"a": pl.String}
+    df = pl.DataFrame({"a": random_texts(rng, 30)}, schema=schema)
+    index = TrigramIndex(schema).update(df)
+    df = pl.concat([df, pl.DataFrame({"a": [*random_texts(rng, 30), "zzzbab"]}, schema=schema)])
+    index = index.update(df)
+
+    for query in [*QUERIES, "zzz", "zb"]:
+        assert index.search(query).to_list() == expected(df, query), query
+
+
+@pytest.mark.parametrize("texts", [[], [None], [""], ["", None, "ab"]])
+def test_texts_without_trigrams(texts):
+    df = pl.DataFrame({"a": texts}, schema={"a": pl.String})
+    index = TrigramIndex({"a": pl.String}).update(df)
+
+    for query in QUERIES:
+        assert index.search(query).to_list() == expected(df, query), query
@@ -0,0 +1,32 @@
+import polars as pl
+import pytest
+
+from ipyvuetable import Table
+
+
+@pytest.fixture
+def table():
+    return Table(pl.LazyFrame({"x": range(10_000)}), virtual_scroll=True)
+
+
+def scroll_to(table: Table, first_visible_row: int) -> tuple[int, int]:
+    row_height, filter_height, _ = table._get_rows_height()
+    table._on_scroll({"new": first_visible_row * row_height + filter_height * table.show_filters})
+    return table._get_window()
+
+
+def test_window_covers_the_buffer_around_the_viewport(table):
+    row_height, _, header_height = table._get_rows_height()
+    nb_visible = -(-int(table.height - header_height) // row_height)
+    buffer = table.virtual_scroll_buffer
+
+    for first_visible_row in range(2 * buffer, 500, 7):
+        index_start, length = scroll_to(table, first_visible_row)
+        assert first_visible_row - index_start >= buffer
+        assert index_start + length - (first_visible_row + nb_visible) >= buffer
+        assert [item["x"] for item in table.items] == list(range(index_start, index_start + length))
+
+
+def test_table_is_displayed_with_its_scroller(table):
+    bundle = table._repr_mimebundle_()
+    assert bundle["application/vnd.jupyter.widget-view+json"]["model_id"] == table.ui.model_id